@@ -0,0 +1,86 @@
+"""Offline check of the jinko caching proxy against the recorded-fixture stand-in.
+
+    python scripts/bench_jinko_proxy.py [--delay 0.3]
+
+Runs the proxy in front of ``replay_server.py`` and replays a planning
+session's worth of repeated, reformatted and concurrent hotel searches,
+directly and through the proxy.  Exits non-zero if caching or coalescing
+does not behave as expected.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+from mcp_stdio import Client
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURE = os.path.join(HERE, os.pardir, "fixtures", "jinko_recording.jsonl")
+
+
+def session() -> list[dict]:
+    """Search arguments in the order a planner might issue them."""
+    base = {"location": "Paris", "check_in": "2026-05-01", "check_out": "2026-05-04", "adults": 2}
+    variants = [
+        base,
+        {**base, "location": " paris "},
+        {**base, "check_in": "2026/05/01", "adults": 2.0},
+        {**base, "adults": 3},
+        {**base, "adults": 1},
+        {"location": "Barcelona", "check_in": "2026-05-02", "check_out": "2026-05-05", "adults": 2},
+        {"adults": 2, "check_out": "2026-05-05", "check_in": "2026-05-02", "location": "BARCELONA"},
+    ]
+    return variants * 3
+
+
+async def run(command: list[str], calls: list[dict], concurrent: int) -> tuple[float, Client]:
+    client = await Client.spawn(command)
+    start = time.perf_counter()
+    burst = [client.call_tool("search_hotels", calls[0]) for _ in range(concurrent)]
+    for result in await asyncio.gather(*burst):
+        assert not result.get("isError"), result
+    for arguments in calls:
+        result = await client.call_tool("search_hotels", arguments)
+        assert not result.get("isError"), result
+    return time.perf_counter() - start, client
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    upstream = [sys.executable, os.path.join(HERE, "replay_server.py"), FIXTURE, "--delay", str(args.delay)]
+    calls = session()
+    with tempfile.TemporaryDirectory() as tmp:
+        direct_s, direct = await run(upstream, calls, args.concurrent)
+        await direct.close()
+
+        proxy_cmd = [sys.executable, os.path.join(HERE, "jinko_proxy.py"), "--cache", os.path.join(tmp, "cache.sqlite"), "--", *upstream]
+        proxied_s, proxy = await run(proxy_cmd, calls, args.concurrent)
+        tools = [t["name"] for t in await proxy.list_tools()]
+        stats = json.loads((await proxy.call_tool("cache_stats", {}))["content"][0]["text"])
+        await proxy.close()
+
+    total = args.concurrent + len(calls)
+    print(f"{total} searches, {args.delay * 1e3:.0f} ms simulated upstream latency")
+    print(f"direct   {direct_s:7.2f} s")
+    print(f"proxied  {proxied_s:7.2f} s  ({direct_s / proxied_s:.1f}x)")
+    print(json.dumps(stats, indent=2))
+    # unique searches after normalisation: Paris x3 party sizes + Barcelona
+    expected = {"misses": 4, "coalesced": args.concurrent - 1, "hits": total - 4 - (args.concurrent - 1)}
+    if "cache_stats" not in tools or any(stats[k] != v for k, v in expected.items()):
+        sys.exit(f"unexpected cache behaviour, wanted {expected}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delay", type=float, default=0.3, help="simulated upstream latency in seconds")
+    parser.add_argument("--concurrent", type=int, default=10, help="identical searches fired at once")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
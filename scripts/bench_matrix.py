@@ -0,0 +1,62 @@
+"""Scaling of the batched distance matrix from 10x10 to 500x500.
+
+    python scripts/bench_matrix.py [--side 100] [--workers 1 4]
+
+Matrices are computed cold (no cache) for each size and worker count; the
+last column shows a cache-hit reload through the returned handle.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from bench_routing import synthetic_city
+from matrix import MatrixCache, distance_matrix
+from routing import RoutingIndex, build_index
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--side", type=int, default=100)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100, 200, 500])
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    points, edges = synthetic_city(args.side)
+    rng = random.Random(2)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "city.ch")
+        build_index(points, edges, path)
+        index = RoutingIndex(path)
+        cache = MatrixCache(os.path.join(tmp, "cache"))
+        print(f"{'size':>9} {'workers':>7} {'seconds':>9} {'cells/s':>10} {'cache hit ms':>12}")
+        for size in args.sizes:
+            origins = rng.sample(points, size)
+            destinations = rng.sample(points, size)
+            for workers in args.workers:
+                index._backward_cache.clear()
+                start = time.perf_counter()
+                matrix = distance_matrix(index, origins, destinations, workers=workers)
+                elapsed = time.perf_counter() - start
+
+                cache.put(matrix)
+                start = time.perf_counter()
+                cached = cache.get(matrix.handle)
+                hit_ms = (time.perf_counter() - start) * 1e3
+                assert np.array_equal(cached.durations, matrix.durations)
+
+                i, j = rng.randrange(size), rng.randrange(size)
+                leg = index.travel_time(origins[i], destinations[j])
+                assert abs(leg.duration_s - matrix.durations[i, j]) < 1e-6 * max(1.0, leg.duration_s)
+                print(f"{size:>4}x{size:<4} {workers:>7} {elapsed:>9.3f} {size * size / elapsed:>10.0f} {hit_ms:>12.2f}")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+"""End-to-end planning benchmark with per-stage profiling and a regression check.
+
+    python scripts/bench_pipeline.py [--repeat 3 --tolerance 0.25]
+    python scripts/bench_pipeline.py --update-baseline      # after an intended change
+
+Replays ``fixtures/trip_requests.jsonl`` through the whole pipeline:
+
+    poi_lookup    POI catalogue: nearby POIs per interest (and optional text)
+    hotel_search  jinko via the caching proxy, upstream replaced by replay_server.py
+    matrix        travel-time matrix on a routing index (in-process, one worker)
+    optimise      solver
+    validate      validator
+    report        map timeline and Gantt chart
+
+External services are replaced by deterministic local stand-ins: synthetic
+street grids and POIs around each city, and the recorded hotel responses in
+``fixtures/jinko_recording.jsonl``.  Building them is setup and not timed.
+Every run of a request starts cold: the routing indexes' search-space caches
+are cleared and the proxy is restarted on an empty response cache.
+
+Every stage records wall time and peak traced memory above its starting
+point, each the best of ``--repeat``, and call counts of hooked functions
+(``HOOKS``).  tracemalloc stays on throughout, so times include its overhead.
+Results go to ``bench_output.txt`` as JSON and are compared with
+``fixtures/bench_baseline.json``: a stage regresses when its time or memory
+grows by more than ``--tolerance`` (and an absolute slack) or its hooked
+call counts grow; a request regresses when its plan scores lower or has more
+validator issues.  Exits non-zero on any regression, and refuses to compare
+runs whose ``--repeat`` or ``--side`` differ from the baseline's (every
+stage is single-threaded, so another CPU count only gets a warning).
+Wall times depend on the machine, so refresh the baseline where the numbers
+are compared.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import functools
+import inspect
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import numpy as np
+
+import report
+from bench_poi_catalogue import CATEGORIES, HOURS, WORDS
+from bench_routing import synthetic_city
+from matrix import distance_matrix
+from mcp_stdio import Client
+from opening_hours import parse_osm
+from poi_catalogue import Poi, PoiCatalogue, build_catalogue
+from routing import RoutingIndex, build_index
+from solver import UNREACHABLE_MIN, Problem, Solver
+from validator import Validator
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, os.pardir)
+REQUESTS = os.path.join(ROOT, "fixtures", "trip_requests.jsonl")
+RECORDING = os.path.join(ROOT, "fixtures", "jinko_recording.jsonl")
+BASELINE = os.path.join(ROOT, "fixtures", "bench_baseline.json")
+OUTPUT = os.path.join(ROOT, "bench_output.txt")
+
+STAGES = ("poi_lookup", "hotel_search", "matrix", "optimise", "validate", "report")
+HOOKS = {
+    "catalogue.find": (PoiCatalogue, "find"),
+    "catalogue.search": (PoiCatalogue, "search"),
+    "mcp.call_tool": (Client, "call_tool"),
+    "routing.nearest": (RoutingIndex, "nearest"),
+    "routing.search": (RoutingIndex, "_search"),
+    "routing.route": (RoutingIndex, "route"),
+    "solver.schedule": (Solver, "schedule"),
+    "solver.insertion": (Solver, "insertion"),
+    "validator.check_day": (Validator, "_check_day"),
+    "report.simplify": (report, "simplify"),
+}
+CITIES = {"paris": (48.8566, 2.3522), "barcelona": (41.3874, 2.1686)}
+VISIT_MIN = {"museum": 120, "attraction": 60, "viewpoint": 30, "restaurant": 75, "cafe": 30, "bakery": 15,
+             "park": 45, "monument": 20, "place_of_worship": 40, "clothes": 45}
+COMPARABLE = ("repeat", "grid_side")  # run settings that change the numbers themselves
+SOLVER_LIMIT_S = 10.0  # a safety net; the fixture trips converge well before it
+
+
+@dataclass
+class StageResult:
+    wall_ms: float
+    peak_kib: float
+    calls: dict[str, int] = field(default_factory=dict)
+
+
+class Profiler:
+    """Per-stage wall time, traced memory peak and call counts of hooked functions."""
+
+    def __init__(self, hooks: dict[str, tuple[object, str]]) -> None:
+        self.hooks = hooks
+        self.counts = dict.fromkeys(hooks, 0)
+        self._saved: list[tuple[object, str, object]] = []
+
+    def __enter__(self) -> "Profiler":
+        for label, (owner, name) in self.hooks.items():
+            original = inspect.getattr_static(owner, name)
+            self._saved.append((owner, name, original))
+            setattr(owner, name, self._counting(label, getattr(owner, name)))
+        tracemalloc.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        tracemalloc.stop()
+        for owner, name, original in reversed(self._saved):
+            setattr(owner, name, original)
+        self._saved.clear()
+
+    def _counting(self, label: str, fn):
+        counts = self.counts
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                counts[label] += 1
+                return await fn(*args, **kwargs)
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                counts[label] += 1
+                return fn(*args, **kwargs)
+        return wrapper
+
+    @contextmanager
+    def stage(self, results: dict[str, StageResult], name: str):
+        before = dict(self.counts)
+        tracemalloc.reset_peak()
+        floor = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        yield
+        wall_ms = (time.perf_counter() - start) * 1e3
+        peak_kib = (tracemalloc.get_traced_memory()[1] - floor) / 1024
+        calls = {k: v - before[k] for k, v in self.counts.items() if v != before[k]}
+        results[name] = StageResult(wall_ms, peak_kib, calls)
+
+
+# --------------------------------------------------------------------------- stand-ins
+
+
+def city_pois(centre: tuple[float, float], count: int, seed: int):
+    rng = np.random.default_rng(seed)
+    hours = [parse_osm(h) for h in HOURS]
+    for i in range(count):
+        category = CATEGORIES[i % len(CATEGORIES)]
+        key, value = category.split("=")
+        name = " ".join(WORDS[k] for k in rng.integers(0, len(WORDS), 2 + i % 3)).title()
+        yield Poi(name, centre[0] + rng.normal(0, 0.008), centre[1] + rng.normal(0, 0.011), category,
+                  {"name": name, key: value}, hours[i % len(hours)] if i % 5 else None)
+
+
+class StandIns:
+    """POI catalogue, routing indexes and the hotel MCP (proxy + replay), built once per run."""
+
+    def __init__(self, tmp: str, side: int) -> None:
+        self.tmp = tmp
+        path = os.path.join(tmp, "pois.cat")
+        build_catalogue((poi for k, centre in enumerate(CITIES.values()) for poi in city_pois(centre, 4000, k)), path)
+        self.catalogue = PoiCatalogue(path)
+        self.indexes = {}
+        for city, centre in CITIES.items():
+            points, edges = synthetic_city(side, centre=centre)
+            build_index(points, edges, os.path.join(tmp, f"{city}.ch"), "car")
+            self.indexes[city] = RoutingIndex(os.path.join(tmp, f"{city}.ch"))
+            self.indexes[city].nearest(centre)  # builds the snapping grid, part of opening rather than of a query
+        self.loop = asyncio.new_event_loop()
+        self.hotels: Client | None = None
+        self.proxy_stats: dict[str, int] = {}
+        self._spawned = 0
+
+    def cold(self) -> None:
+        """Forget what earlier runs left warm: routing search spaces and cached hotel responses."""
+        for index in self.indexes.values():
+            index._backward_cache.clear()
+        self._stop_hotels()
+        self._spawned += 1
+        upstream = [sys.executable, os.path.join(HERE, "replay_server.py"), RECORDING]
+        cache = os.path.join(self.tmp, f"jinko-{self._spawned}.sqlite")
+        proxy = [sys.executable, os.path.join(HERE, "jinko_proxy.py"), "--cache", cache, "--", *upstream]
+        self.hotels = self.loop.run_until_complete(Client.spawn(proxy))
+
+    def _stop_hotels(self) -> None:
+        if self.hotels is None:
+            return
+        for k, v in self.call("cache_stats", {}).items():
+            if k in ("hits", "misses", "coalesced", "passthrough", "upstream_errors"):
+                self.proxy_stats[k] = self.proxy_stats.get(k, 0) + v
+        self.loop.run_until_complete(self.hotels.close())
+        self.hotels = None
+
+    def call(self, tool: str, arguments: dict) -> dict:
+        result = self.loop.run_until_complete(self.hotels.call_tool(tool, arguments))
+        if result.get("isError"):
+            raise RuntimeError(result["content"][0]["text"])
+        return json.loads(result["content"][0]["text"])
+
+    def close(self) -> dict[str, int]:
+        self._stop_hotels()
+        self.loop.close()
+        self.catalogue.close()
+        for index in self.indexes.values():
+            index.close()
+        return self.proxy_stats
+
+
+# --------------------------------------------------------------------------- pipeline
+
+
+def plan(request: dict, env: StandIns, profiler: Profiler) -> tuple[dict[str, StageResult], dict]:
+    stages: dict[str, StageResult] = {}
+    centre = tuple(request["centre"])
+    index = env.indexes[request["location"].lower()]
+
+    with profiler.stage(stages, "poi_lookup"):
+        per_interest = max(1, request["max_pois"] // len(request["interests"]))
+        found: dict[int, int] = {}
+        for rank, interest in enumerate(request["interests"]):
+            for i, _ in env.catalogue.find(centre, request["radius_m"], per_interest, interest, request.get("text")):
+                found.setdefault(i, len(request["interests"]) - rank)
+        pois = []
+        for i, weight in found.items():
+            poi = env.catalogue[i]
+            pois.append({**poi.to_json(), "duration_min": VISIT_MIN.get(poi.category.split("=")[1], 60),
+                         "priority": weight * 3 + len(poi.name) % 3})
+
+    with profiler.stage(stages, "hotel_search"):
+        search = {k: request[k] for k in ("location", "check_in", "check_out", "adults")}
+        offers = env.call("search_hotels", search)["hotels"]
+        details = [env.call("get_hotel_details", {"hotel_id": h["hotel_id"]}) for h in offers]
+        best = max(zip(offers, details), key=lambda o: (o[1]["rating"] / o[0]["price_per_night"], o[0]["hotel_id"]))[0]
+        hotel = {"name": best["name"], "lat": best["lat"], "lon": best["lon"], "cost": best["price_per_night"],
+                 "check_in": best["check_in"], "check_out": best["check_out"]}
+
+    first = datetime.date.fromisoformat(request["check_in"])
+    nights = (datetime.date.fromisoformat(request["check_out"]) - first).days
+    problem = {
+        "pois": pois,
+        "days": [{"date": (first + datetime.timedelta(d)).isoformat(), "start": request.get("start", "09:00"),
+                  "end": request.get("end", "21:00"), "hotel": hotel} for d in range(nights)],
+    }
+
+    with profiler.stage(stages, "matrix"):
+        points = [(hotel["lat"], hotel["lon"])] + [(p["lat"], p["lon"]) for p in pois]
+        durations = distance_matrix(index, points, points, workers=1).durations / 60.0
+        travel = np.where(np.isinf(durations), UNREACHABLE_MIN, durations)
+
+    with profiler.stage(stages, "optimise"):
+        solver = Solver(Problem.from_json(problem, travel), SOLVER_LIMIT_S).solve()
+        itinerary = solver.itinerary()
+
+    with profiler.stage(stages, "validate"):
+        issues = Validator(itinerary).issues
+
+    with profiler.stage(stages, "report"):
+        report.render(itinerary, os.path.join(env.tmp, "report", request["name"]), index)
+
+    visited = sum(len(day["stops"]) for day in itinerary["days"])
+    return stages, {"visited": visited, "candidates": len(pois), "score": round(solver.score(), 2), "issues": len(issues)}
+
+
+# --------------------------------------------------------------------------- results
+
+
+def run(requests: list[dict], repeat: int, side: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        env = StandIns(tmp, side)
+        setup_s = time.perf_counter() - start
+        results = []
+        with Profiler(HOOKS) as profiler:
+            for request in requests:
+                best: dict[str, StageResult] = {}
+                for _ in range(repeat):
+                    env.cold()
+                    stages, outcome = plan(request, env, profiler)
+                    for name, stage in stages.items():
+                        if name not in best:
+                            best[name] = stage
+                        else:
+                            best[name].wall_ms = min(best[name].wall_ms, stage.wall_ms)
+                            best[name].peak_kib = min(best[name].peak_kib, stage.peak_kib)
+                results.append({"name": request["name"], **outcome,
+                                "stages": {name: _stage_json(best[name]) for name in STAGES}})
+        proxy_stats = env.close()
+
+    totals = {}
+    for name in STAGES:
+        calls: dict[str, int] = {}
+        for r in results:
+            for k, v in r["stages"][name]["calls"].items():
+                calls[k] = calls.get(k, 0) + v
+        totals[name] = {
+            "wall_ms": round(sum(r["stages"][name]["wall_ms"] for r in results), 3),
+            "peak_kib": round(max(r["stages"][name]["peak_kib"] for r in results), 1),
+            "calls": dict(sorted(calls.items())),
+        }
+    return {
+        "meta": {"created": datetime.datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+                 "machine": platform.machine(), "cpus": os.cpu_count(), "repeat": repeat, "grid_side": side,
+                 "setup_s": round(setup_s, 2), "tracemalloc": True, "hotel_proxy": proxy_stats},
+        "stages": totals,
+        "total_wall_ms": round(sum(t["wall_ms"] for t in totals.values()), 3),
+        "requests": results,
+    }
+
+
+def _stage_json(stage: StageResult) -> dict:
+    return {"wall_ms": round(stage.wall_ms, 3), "peak_kib": round(stage.peak_kib, 1), "calls": dict(sorted(stage.calls.items()))}
+
+
+def check_comparable(meta: dict, baseline: dict) -> None:
+    """Raise ``ValueError`` if the run settings in ``meta`` differ from the baseline's."""
+    differ = [k for k in COMPARABLE if meta.get(k) != baseline["meta"].get(k)]
+    if differ:
+        raise ValueError("baseline was recorded with different " + ", ".join(
+            f"{k} ({baseline['meta'].get(k)} vs {meta.get(k)})" for k in differ))
+
+
+def regressions(current: dict, baseline: dict, tolerance: float, slack_ms: float, slack_kib: float) -> list[str]:
+    check_comparable(current["meta"], baseline)
+    found = []
+    for name, now in current["stages"].items():
+        was = baseline["stages"].get(name)
+        if was is None:
+            continue
+        if now["wall_ms"] > was["wall_ms"] * (1 + tolerance) + slack_ms:
+            found.append(f"{name}: wall {was['wall_ms']:.1f} -> {now['wall_ms']:.1f} ms")
+        if now["peak_kib"] > was["peak_kib"] * (1 + tolerance) + slack_kib:
+            found.append(f"{name}: peak memory {was['peak_kib']:.0f} -> {now['peak_kib']:.0f} KiB")
+        for hook, count in now["calls"].items():
+            if count > was["calls"].get(hook, 0) * (1 + tolerance):
+                found.append(f"{name}: {hook} calls {was['calls'].get(hook, 0)} -> {count}")
+    before = {r["name"]: r for r in baseline["requests"]}
+    for r in current["requests"]:
+        was = before.get(r["name"])
+        if was is None:
+            continue
+        if r["score"] < was["score"] - 1e-6:
+            found.append(f"{r['name']}: plan score {was['score']} -> {r['score']}")
+        if r["issues"] > was["issues"]:
+            found.append(f"{r['name']}: validator issues {was['issues']} -> {r['issues']}")
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", default=REQUESTS)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--output", default=OUTPUT)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per request; wall time is the best")
+    parser.add_argument("--side", type=int, default=60, help="synthetic street grid side per city")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative growth")
+    parser.add_argument("--slack-ms", type=float, default=5.0, help="allowed absolute growth of stage time")
+    parser.add_argument("--slack-kib", type=float, default=256.0, help="allowed absolute growth of stage memory")
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the new baseline")
+    args = parser.parse_args()
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        try:  # before spending minutes on a run that cannot be compared
+            check_comparable({"repeat": args.repeat, "grid_side": args.side}, baseline)
+        except ValueError as exc:
+            sys.exit(f"{exc}; run with the baseline's settings or --update-baseline")
+        if baseline["meta"].get("cpus") != os.cpu_count():
+            print(f"warning: baseline recorded on {baseline['meta'].get('cpus')} CPUs, this machine has {os.cpu_count()}",
+                  file=sys.stderr)
+
+    with open(args.requests) as f:
+        requests = [json.loads(line) for line in f if line.strip()]
+    result = run(requests, args.repeat, args.side)
+    result["regressions"] = regressions(result, baseline, args.tolerance, args.slack_ms, args.slack_kib) if baseline else []
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+        f.write("\n")
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({k: v for k, v in result.items() if k != "regressions"}, f, indent=2)
+            f.write("\n")
+
+    was = baseline["stages"] if baseline else {}
+    print(f"{len(requests)} requests x {args.repeat}, setup {result['meta']['setup_s']:.1f} s")
+    print(f"{'stage':<13} {'wall ms':>9} {'baseline':>9} {'peak KiB':>9}  calls")
+    for name, stage in result["stages"].items():
+        base = f"{was[name]['wall_ms']:9.1f}" if name in was else f"{'-':>9}"
+        calls = ", ".join(f"{k} {v}" for k, v in stage["calls"].items())
+        print(f"{name:<13} {stage['wall_ms']:9.1f} {base} {stage['peak_kib']:9.0f}  {calls}")
+    for r in result["requests"]:
+        print(f"  {r['name']:<24} {r['visited']:>3}/{r['candidates']:<3} stops, score {r['score']:8.2f}, {r['issues']} issues")
+    print(f"results: {os.path.relpath(args.output)}" + (f", baseline updated: {os.path.relpath(args.baseline)}" if args.update_baseline else ""))
+    if result["regressions"]:
+        sys.exit("regressions:\n  " + "\n  ".join(result["regressions"]))
+
+
+if __name__ == "__main__":
+    main()
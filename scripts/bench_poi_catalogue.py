@@ -0,0 +1,118 @@
+"""POI catalogue query latency on a synthetic country-sized dataset.
+
+    python scripts/bench_poi_catalogue.py [--pois 2000000 --queries 200]
+
+POIs are clustered around a few hundred "towns" spread over a France-sized
+box, with realistic names, categories and a dozen opening-hours patterns.
+The catalogue is built to a temporary file, reopened memory-mapped, and each
+query type is timed from random towns.  Results are checked against a brute
+force scan of the same columns on a sample of queries.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from opening_hours import parse_osm
+from poi_catalogue import E7, Poi, PoiCatalogue, _haversine, build_catalogue
+
+WORDS = ("musée saint jean pierre marie notre dame château parc jardin place église tour pont vieux grand petit "
+         "boulangerie café du commerce des arts la fontaine moulin rouge bleu marché halles gare").split()
+CATEGORIES = ("tourism=museum", "tourism=attraction", "tourism=viewpoint", "amenity=restaurant", "amenity=cafe",
+              "amenity=place_of_worship", "leisure=park", "historic=monument", "shop=bakery", "shop=clothes")
+HOURS = ("Mo-Fr 09:00-18:00", "Tu-Su 10:00-18:00", "24/7", "Mo-Sa 07:00-20:00", "Mo-Su 12:00-14:30,19:00-23:00",
+         "Tu-Sa 09:30-12:30,14:00-19:00", "We-Mo 10:00-17:30", "Fr-Sa 18:00-02:00", "Sa-Su 08:00-13:00", "Mo-Fr 08:00-12:00")
+
+
+def synthetic_pois(count: int, towns: int = 400, seed: int = 0):
+    rng = random.Random(seed)
+    hours = [parse_osm(h) for h in HOURS]
+    centres = [(rng.uniform(42.5, 51.0), rng.uniform(-4.5, 7.5), rng.uniform(0.01, 0.08)) for _ in range(towns)]
+    for i in range(count):
+        lat, lon, spread = centres[i % towns]
+        category = rng.choice(CATEGORIES)
+        key, value = category.split("=")
+        name = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 4))).title()
+        yield Poi(name, lat + rng.gauss(0, spread), lon + rng.gauss(0, spread * 1.4), category,
+                  {"name": name, key: value}, rng.choice(hours) if rng.random() < 0.7 else None)
+
+
+def _ms(samples: list[float]) -> str:
+    p50, p95 = np.percentile(samples, [50, 95]) * 1e3
+    return f"p50 {p50:7.3f} ms  p95 {p95:7.3f} ms"
+
+
+def _rss_mib() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pois", type=int, default=2_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--check", type=int, default=20, help="queries verified by brute force")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "pois.cat")
+        start = time.perf_counter()
+        build_catalogue(synthetic_pois(args.pois), path)
+        build_s = time.perf_counter() - start
+
+        rss_before = _rss_mib()
+        start = time.perf_counter()
+        catalogue = PoiCatalogue(path)
+        open_ms = (time.perf_counter() - start) * 1e3
+        rng = random.Random(1)
+        towns = [(rng.uniform(42.5, 51.0), rng.uniform(-4.5, 7.5)) for _ in range(args.queries)]
+        # query around real POIs so results are non-empty
+        points = [(catalogue.lat[i] / E7, catalogue.lon[i] / E7) for i in (rng.randrange(len(catalogue)) for _ in towns)]
+        when = datetime.datetime(2026, 5, 2, 11, 0)
+        queries = {
+            "radius 1 km": lambda p: catalogue.within(p, 1000),
+            "bbox 2x2 km": lambda p: catalogue.bbox(p[0] - 0.009, p[1] - 0.013, p[0] + 0.009, p[1] + 0.013),
+            "10 nearest": lambda p: catalogue.nearest(p, 10),
+            "10 nearest museums open": lambda p: catalogue.find(p, k=10, category="museum", when=when),
+            "text 'notre dame'": lambda p: catalogue.search("notre dame"),
+            "fuzzy 'boulangrie chatau'": lambda p: catalogue.search("boulangrie chatau"),
+            "near + text 'moulin rouge'": lambda p: catalogue.find(p, radius_m=5000, text="moulin rouge"),
+        }
+        timings = {name: [] for name in queries}
+        for p in points:
+            for name, query in queries.items():
+                start = time.perf_counter()
+                query(p)
+                timings[name].append(time.perf_counter() - start)
+        rss_after = _rss_mib()
+
+        lat, lon = np.asarray(catalogue.lat) / E7, np.asarray(catalogue.lon) / E7
+        for p in points[: args.check]:
+            dist = _haversine(p, lat, lon)
+            ids, _ = catalogue.within(p, 1000)
+            assert set(ids.tolist()) == set(np.flatnonzero(dist <= 1000).tolist())
+            _, d = catalogue.nearest(p, 10)
+            assert np.allclose(d, np.sort(dist)[:10])
+        exact = catalogue.search("boulangerie chateau", fuzzy=False)
+        assert np.array_equal(catalogue.search("boulangrie chatau"), exact) and len(exact)
+
+        size_mib = os.path.getsize(path) / 2**20
+        print(f"{len(catalogue)} POIs, build {build_s:.1f} s, file {size_mib:.0f} MiB, open {open_ms:.2f} ms, "
+              f"RSS +{rss_after - rss_before:.0f} MiB after {args.queries} queries of each kind")
+        for name, samples in timings.items():
+            print(f"{name:<28} {_ms(samples)}")
+        catalogue.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Incremental repair versus full re-planning on recorded edit sessions.
+
+    python scripts/bench_replan.py [--sessions fixtures/replan_sessions.jsonl --time-limit 2]
+
+Each session names a synthetic problem (``bench_solver.synthetic_problem``)
+and a sequence of mid-trip edits.  Two planners start from the same plan;
+one repairs after every edit, the other rebuilds the travel-time matrix and
+re-solves the remaining days with the full time budget.  Prints per-edit
+latency, planned priority and validator issues for both.  Exits non-zero if
+an incremental repair takes a second or more, or if its incrementally
+maintained validation disagrees with a from-scratch validation, or if the
+written itinerary of a remaining day differs from the solver's schedule.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import os
+import sys
+
+import numpy as np
+
+from bench_solver import synthetic_problem
+from replan import Replanner
+from validator import validate
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SESSIONS = os.path.join(HERE, os.pardir, "fixtures", "replan_sessions.jsonl")
+
+
+def _describe(edit: dict) -> str:
+    return " ".join(f"{v}" for k, v in edit.items() if k not in ("lat", "lon")) + (" @pos" if "lat" in edit else "")
+
+
+def _stale_days(planner: Replanner) -> list[int]:
+    """Remaining days whose written stops differ from the solver's schedule (closures only trim opening hours)."""
+    def strip(stops: list[dict]) -> list[dict]:
+        return [{k: v for k, v in stop.items() if k != "opening_hours"} for stop in stops]
+
+    return [r.day for r in planner.solver.routes[planner.day:]
+            if strip(planner.itinerary["days"][r.day]["stops"][len(planner.done.get(r.day, [])):])
+            != strip(planner.solver.day_stops(r))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", default=SESSIONS)
+    parser.add_argument("--time-limit", type=float, default=2.0, help="initial and full re-plan solver budget")
+    args = parser.parse_args()
+
+    with open(args.sessions) as f:
+        sessions = [json.loads(line) for line in f if line.strip()]
+    incremental_s, full_s, failures = [], [], []
+    for session in sessions:
+        problem = synthetic_problem(**session["problem"])
+        planner = Replanner(problem, time_limit_s=args.time_limit)
+        baseline = copy.deepcopy(planner)
+        print(f"\n{session['name']} (start: priority {planner.score():.0f})")
+        print(f"{'edit':<34} {'repair ms':>9} {'priority':>8} {'issues':>6}   {'full ms':>8} {'priority':>8} {'issues':>6}")
+        for edit in session["edits"]:
+            fast = planner.apply(edit)
+            slow = baseline.apply(edit, full=True)
+            incremental_s.append(fast.seconds)
+            full_s.append(slow.seconds)
+            print(f"{_describe(edit)[:34]:<34} {fast.seconds * 1e3:>9.1f} {planner.score():>8.0f} {len(fast.issues):>6}"
+                  f"   {slow.seconds * 1e3:>8.0f} {baseline.score():>8.0f} {len(slow.issues):>6}")
+            if fast.seconds >= 1.0:
+                failures.append(f"{session['name']}: {edit} took {fast.seconds:.2f} s")
+            if len(validate(copy.deepcopy(planner.itinerary))) != len(fast.issues):
+                failures.append(f"{session['name']}: {edit} left stale validation")
+            if stale := _stale_days(planner):
+                failures.append(f"{session['name']}: {edit} left stale stops on days {stale}")
+
+    inc, full = np.array(incremental_s) * 1e3, np.array(full_s) * 1e3
+    print(f"\n{len(inc)} edits: repair p50 {np.median(inc):.1f} ms, max {inc.max():.1f} ms; "
+          f"full re-plan p50 {np.median(full):.0f} ms ({np.median(full) / np.median(inc):.0f}x)")
+    if failures:
+        sys.exit("\n".join(failures))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Report render time and output size for a 30-day trip with dense road geometry.
+
+    python scripts/bench_report.py [--days 30 --stops 400 --spacing-m 8]
+
+Road geometry comes from a stand-in for ``RoutingIndex.route`` that returns a
+jittered polyline with a point every ``--spacing-m`` metres, so no routing
+index has to be built.  Prints render time, peak Python memory while
+streaming, and the size of each output next to plain JSON coordinates.
+Packed geometry is decoded again and checked against the input.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import math
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from bench_validator import synthetic_itinerary
+from report import QUANTUM, ZOOM_LEVELS, _day_payload, animation_frames, pack, render, trip_days
+from routing import haversine_m
+
+
+class WigglyRoutes:
+    """Stand-in for a routing index: a noisy street-like path between two points."""
+
+    def __init__(self, spacing_m: float, seed: int = 0):
+        self.spacing_m = spacing_m
+        self.rng = random.Random(seed)
+
+    def route(self, origin, destination):
+        n = max(2, int(haversine_m(origin, destination) / self.spacing_m))
+        (a_lat, a_lon), (b_lat, b_lon) = origin, destination
+        points = []
+        for i in range(1, n):
+            u = i / n
+            bend = 0.0004 * math.sin(u * math.pi * 3)
+            points.append((a_lat + u * (b_lat - a_lat) + bend + self.rng.uniform(-2e-5, 2e-5),
+                           a_lon + u * (b_lon - a_lon) - bend + self.rng.uniform(-2e-5, 2e-5)))
+        return None, points
+
+
+def unpack(b64: str) -> list[tuple[float, float]]:
+    data, values, i = base64.b64decode(b64), [], 0
+    while i < len(data):
+        z, shift = 0, 0
+        while True:
+            c = data[i]
+            i += 1
+            z |= (c & 0x7F) << shift
+            shift += 7
+            if not c & 0x80:
+                break
+        values.append((z >> 1) ^ -(z & 1))
+    for k in range(2, len(values)):
+        values[k] += values[k - 2]
+    return [(values[k] / QUANTUM, values[k + 1] / QUANTUM) for k in range(0, len(values), 2)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--stops", type=int, default=400)
+    parser.add_argument("--spacing-m", type=float, default=8.0)
+    args = parser.parse_args()
+
+    itinerary = synthetic_itinerary(args.days, args.stops)
+    for day in itinerary["days"]:  # spread stops over the city so legs are long enough to matter
+        for stop in day["stops"]:
+            if "lat" in stop:
+                stop["lat"] = 48.85 + (stop["lat"] - 48.85) * 10
+                stop["lon"] = 2.35 + (stop["lon"] - 2.35) * 10
+    routes = WigglyRoutes(args.spacing_m)
+    plans = list(trip_days(itinerary, routes))
+    raw_points = sum(len(leg.points) for plan in plans for leg in plan.legs)
+    raw_json = len(json.dumps([[list(p) for leg in plan.legs for p in leg.points] for plan in plans]))
+
+    levels = {z: 0 for z in ZOOM_LEVELS}
+    for plan in plans:
+        payload = _day_payload(plan)
+        for level in payload["g"]:
+            levels[level["z"]] += len(level["o"]) and level["o"][-1]
+        finest = unpack(payload["g"][-1]["p"])
+        assert len(finest) == payload["g"][-1]["o"][-1]
+    sample = plans[0].legs[0].points
+    assert all(abs(a - b) <= 0.6 / QUANTUM for p, q in zip(unpack(pack(sample)), sample) for a, b in zip(p, q))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        paths = render(itinerary, tmp, WigglyRoutes(args.spacing_m), frames=True)
+        render_s = time.perf_counter() - start
+        tracemalloc.start()
+        render(itinerary, tmp, WigglyRoutes(args.spacing_m), frames=True)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        sizes = {kind: os.path.getsize(path) for kind, path in paths.items()}
+        start = time.perf_counter()
+        frames = sum(1 for _ in animation_frames(trip_days(itinerary, routes)))
+        frames_s = time.perf_counter() - start
+
+    print(f"{args.days} days, {args.stops} stops, {raw_points} route points ({raw_json / 1024:.0f} KiB as JSON)")
+    print("points per zoom level: " + ", ".join(f"z{z} {n}" for z, n in levels.items()))
+    print(f"render            {render_s * 1e3:8.0f} ms, peak traced memory {peak / 2**20:.1f} MiB")
+    for kind, size in sizes.items():
+        print(f"  {kind:<6}          {size / 1024:8.0f} KiB")
+    print(f"frames            {frames} in {frames_s * 1e3:.0f} ms (generated lazily)")
+
+
+if __name__ == "__main__":
+    main()
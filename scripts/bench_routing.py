@@ -0,0 +1,106 @@
+"""Query throughput of the CH index versus plain Dijkstra.
+
+    python scripts/bench_routing.py                      # synthetic 100x100 grid city
+    python scripts/bench_routing.py --extract city.osm.pbf --profile foot
+
+Both engines answer the same random point-to-point and one-to-many queries;
+results are cross-checked before timings are reported.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from routing import Point, RoutingIndex, build_index, dijkstra, graph_from_osm, haversine_m
+
+
+def synthetic_city(side: int = 100, seed: int = 0, centre: Point = (48.8566, 2.3522)):
+    """A jittered ``side x side`` street grid, ~80 m blocks, with some one-way and fast streets."""
+    rng = random.Random(seed)
+    step = 0.0008
+    points = [
+        (centre[0] + (i - side / 2) * step + rng.uniform(-1, 1) * step / 5,
+         centre[1] + (j - side / 2) * step * 1.5 + rng.uniform(-1, 1) * step / 5)
+        for i in range(side) for j in range(side)
+    ]
+    edges = {}
+    for i in range(side):
+        for j in range(side):
+            u = i * side + j
+            for v in ((i + 1) * side + j if i + 1 < side else -1, u + 1 if j + 1 < side else -1):
+                if v < 0:
+                    continue
+                metres = haversine_m(points[u], points[v])
+                kmh = 50 if (i % 10 == 0 or j % 10 == 0) else 30
+                cost = (metres / (kmh / 3.6), metres)
+                edges[u, v] = cost
+                if rng.random() > 0.1:
+                    edges[v, u] = cost
+    return points, edges
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--extract", help="OSM extract; defaults to a synthetic grid city")
+    parser.add_argument("--profile", default="car")
+    parser.add_argument("--side", type=int, default=100, help="synthetic grid side length")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--targets", type=int, default=50, help="destinations per one-to-many query")
+    args = parser.parse_args()
+
+    points, edges = graph_from_osm(args.extract, args.profile) if args.extract else synthetic_city(args.side)
+    adjacency = [[] for _ in points]
+    for (u, v), (t, _) in edges.items():
+        adjacency[u].append((v, t))
+    print(f"graph: {len(points)} nodes, {len(edges)} edges")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "city.ch")
+        start = time.perf_counter()
+        build_index(points, edges, path, args.profile)
+        print(f"index build: {time.perf_counter() - start:.1f} s, {os.path.getsize(path) / 1e6:.1f} MB")
+        index = RoutingIndex(path)
+
+        rng = random.Random(1)
+        pairs = [(rng.randrange(len(points)), rng.randrange(len(points))) for _ in range(args.queries)]
+
+        start = time.perf_counter()
+        baseline = [dijkstra(adjacency, s, [t]).get(t) for s, t in pairs]
+        naive_s = time.perf_counter() - start
+        start = time.perf_counter()
+        answers = [index.many_to_many_nodes([s], [t])[0][0] for s, t in pairs]
+        ch_s = time.perf_counter() - start
+        for expected, leg in zip(baseline, answers):
+            assert (expected is None) == (leg is None)
+            assert leg is None or abs(leg.duration_s - expected) < 1e-6 * max(1.0, expected), (leg, expected)
+        print(f"point-to-point  dijkstra {args.queries / naive_s:10.0f} q/s  {naive_s / args.queries * 1e6:9.0f} us/q")
+        print(f"point-to-point  ch       {args.queries / ch_s:10.0f} q/s  {ch_s / args.queries * 1e6:9.0f} us/q"
+              f"  ({naive_s / ch_s:.0f}x)")
+
+        sources = [s for s, _ in pairs[: max(1, args.queries // 10)]]
+        targets = [rng.randrange(len(points)) for _ in range(args.targets)]
+        start = time.perf_counter()
+        for s in sources:
+            dijkstra(adjacency, s, targets)
+        naive_s = time.perf_counter() - start
+        start = time.perf_counter()
+        for s in sources:
+            index.many_to_many_nodes([s], targets)
+        ch_s = time.perf_counter() - start
+        print(f"one-to-{args.targets:<8} dijkstra {len(sources) / naive_s:10.0f} q/s")
+        print(f"one-to-{args.targets:<8} ch       {len(sources) / ch_s:10.0f} q/s  ({naive_s / ch_s:.0f}x,"
+              " destination search spaces memoised after the first query)")
+
+        for s, t in pairs[:20]:
+            leg, nodes = index.route_nodes(s, t)
+            assert nodes[0] == s and nodes[-1] == t
+            assert abs(sum(edges[a, b][0] for a, b in zip(nodes, nodes[1:])) - leg.duration_s) < 1e-6 * max(1.0, leg.duration_s)
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
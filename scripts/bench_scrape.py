@@ -0,0 +1,138 @@
+"""Scraping throughput (pages/s) versus pool size on a local static-site fixture.
+
+    python scripts/bench_scrape.py [--pages 120 --pools 1 2 4 8 --latency-ms 80]
+    python scripts/bench_scrape.py --fetcher http      # without a browser
+
+The fixture is generated into a temporary directory and served by three
+local HTTP servers (three "domains"), each page carrying images, a web font,
+a stylesheet and an ad script next to its opening hours, price and ticket
+status.  The last run repeats the largest pool without resource blocking to
+show the bytes saved.  Extracted values are checked against the fixture.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from scrape import BrowserPool, HttpFetcher, ResultStore, scrape
+
+PAGE = """<!doctype html>
+<html><head><title>{name}</title>
+<link rel="stylesheet" href="/static/site.css">
+<script src="/ads/tracker.js"></script>
+{json_ld}
+</head><body>
+<h1>{name}</h1>
+<img src="/static/hero.jpg"><img src="/static/gallery1.jpg"><img src="/static/gallery2.jpg">
+<p>{text}</p>
+</body></html>
+"""
+
+
+def build_site(root: str, pages: int, seed: int = 0) -> dict[str, dict]:
+    """Write the fixture pages and assets; return ``path -> expected extraction``."""
+    rng = random.Random(seed)
+    os.makedirs(os.path.join(root, "static"))
+    os.makedirs(os.path.join(root, "ads"))
+    for name, size in (("hero.jpg", 180_000), ("gallery1.jpg", 90_000), ("gallery2.jpg", 90_000), ("font.woff2", 60_000)):
+        with open(os.path.join(root, "static", name), "wb") as f:
+            f.write(os.urandom(size))
+    with open(os.path.join(root, "static", "site.css"), "w") as f:
+        f.write("@font-face{font-family:x;src:url(/static/font.woff2)} body{font-family:x}" + " " * 20_000)
+    with open(os.path.join(root, "ads", "tracker.js"), "w") as f:
+        f.write("//" + "x" * 40_000)
+
+    expected = {}
+    for i in range(pages):
+        price = float(rng.choice([0, 8, 12.5, 19, 25]))
+        sold_out = rng.random() < 0.2
+        hours = {d: [["09:00", "18:00"]] for d in ("tue", "wed", "thu", "fri", "sat", "sun")}
+        if i % 2:
+            offer = {"@type": "Offer", "price": price, "priceCurrency": "EUR",
+                     "availability": f"https://schema.org/{'SoldOut' if sold_out else 'InStock'}"}
+            json_ld = json.dumps({"@context": "https://schema.org", "@type": "TouristAttraction", "name": f"Sight {i}",
+                                  "openingHours": "Tu-Su 09:00-18:00", "offers": offer})
+            json_ld, text = f'<script type="application/ld+json">{json_ld}</script>', "Welcome."
+        else:
+            json_ld = ""
+            text = f"Open Tu-Su 09:00-18:00. Adults €{price:.2f}. {'Sold out today.' if sold_out else 'Tickets available.'}"
+        with open(os.path.join(root, f"sight-{i}.html"), "w") as f:
+            f.write(PAGE.format(name=f"Sight {i}", json_ld=json_ld, text=text))
+        expected[f"/sight-{i}.html"] = {"opening_hours": hours, "price": price,
+                                        "availability": "sold_out" if sold_out else "available"}
+    return expected
+
+
+class _Handler(SimpleHTTPRequestHandler):
+    latency_s = 0.0
+
+    def do_GET(self):
+        time.sleep(self.latency_s)
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(root: str, latency_s: float, count: int = 3) -> list[ThreadingHTTPServer]:
+    handler = type("Handler", (_Handler,), {"latency_s": latency_s})
+    servers = []
+    for _ in range(count):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(handler, directory=root))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    return servers
+
+
+async def run(urls: list[str], fetcher, per_domain: int, store_path: str):
+    store = ResultStore(store_path)
+    async with fetcher:
+        stats = await scrape(urls, fetcher, store, per_domain)
+    return stats, store
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=120)
+    parser.add_argument("--pools", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--per-domain", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=80.0, help="server-side delay per request")
+    parser.add_argument("--fetcher", choices=("browser", "http"), default="browser")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        site = os.path.join(tmp, "site")
+        expected = build_site(site, args.pages)
+        servers = serve(site, args.latency_ms / 1000)
+        urls = [f"http://127.0.0.1:{servers[i % len(servers)].server_address[1]}{path}"
+                for i, path in enumerate(expected)]
+
+        runs = [(pool, True) for pool in args.pools]
+        if args.fetcher == "browser":
+            runs.append((max(args.pools), False))
+        print(f"{'pool':>4} {'blocking':>8} {'pages/s':>8} {'MB':>7} {'blocked':>7} {'errors':>6}")
+        for k, (pool, block) in enumerate(runs):
+            fetcher = HttpFetcher(pool) if args.fetcher == "http" else BrowserPool(pool, block_resources=block)
+            stats, store = asyncio.run(run(urls, fetcher, args.per_domain, os.path.join(tmp, f"run{k}.sqlite")))
+            print(f"{pool:>4} {'on' if block else 'off':>8} {stats.pages_per_s:>8.1f} {stats.bytes / 1e6:>7.2f} "
+                  f"{stats.blocked:>7} {stats.errors:>6}")
+            assert max(stats.per_domain_peak.values()) <= args.per_domain
+            for row in store.rows():
+                want = expected["/" + row["url"].split("/", 3)[3]]
+                got = {"opening_hours": json.loads(row["opening_hours"]), "price": row["price"], "availability": row["availability"]}
+                assert got == want, (row["url"], got, want)
+        for server in servers:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Solution quality and runtime of the itinerary solver on synthetic cities.
+
+    python scripts/bench_solver.py [--pois 200 --days 10 --cities 3 --time-limit 3]
+
+For each city the table shows the construction-only plan and the plan after
+local search; every final plan is run through the validator.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import random
+import time
+
+import numpy as np
+
+from solver import Problem, Solver
+from validator import validate
+
+
+def synthetic_problem(pois: int = 200, days: int = 10, seed: int = 0) -> dict:
+    """POIs in a few dense clusters around a city centre, with varied hours, durations and priorities."""
+    rng = random.Random(seed)
+    centre = (41.39 + rng.uniform(-5, 5), 2.17 + rng.uniform(-5, 5))
+    clusters = [(centre[0] + rng.gauss(0, 0.03), centre[1] + rng.gauss(0, 0.04)) for _ in range(6)]
+    out_pois = []
+    for i in range(pois):
+        lat, lon = rng.choice(clusters)
+        kind = rng.random()
+        if kind < 0.5:
+            hours = [["09:00", "18:00"]]
+        elif kind < 0.7:
+            hours = {d: [["10:00", "13:00"], ["15:00", "19:00"]] for d in ("tue", "wed", "thu", "fri", "sat")}
+        elif kind < 0.85:
+            hours = [["19:00", "23:00"]]
+        else:
+            hours = None
+        poi = {"name": f"POI {i}", "lat": lat + rng.gauss(0, 0.008), "lon": lon + rng.gauss(0, 0.01),
+               "duration_min": rng.choice([30, 45, 60, 90, 120, 180]), "priority": rng.randint(1, 10)}
+        if hours is not None:
+            poi["opening_hours"] = hours
+        out_pois.append(poi)
+    first = datetime.date(2026, 5, 4)
+    hotels = [{"name": f"Hotel {k}", "lat": c[0], "lon": c[1]} for k, c in enumerate(clusters[:3])]
+    out_days = [
+        {"date": (first + datetime.timedelta(d)).isoformat(), "start": "09:00", "end": "23:30",
+         "hotel": hotels[d * len(hotels) // days]}
+        for d in range(days)
+    ]
+    return {"pois": out_pois, "days": out_days}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pois", type=int, default=200)
+    parser.add_argument("--days", type=int, default=10)
+    parser.add_argument("--cities", type=int, default=3)
+    parser.add_argument("--time-limit", type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(f"{'city':>4} {'stage':>12} {'visited':>7} {'priority':>8} {'travel min':>10} {'score':>9} {'seconds':>7} {'issues':>6}")
+    for seed in range(args.cities):
+        problem = synthetic_problem(args.pois, args.days, seed)
+        start = time.perf_counter()
+        p = Problem.from_json(problem)
+        setup_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        solver = Solver(p, args.time_limit)
+        solver.construct()
+        _row(seed, "construction", solver, setup_s + time.perf_counter() - start, None)
+
+        start = time.perf_counter()
+        solver = Solver(p, args.time_limit).solve()
+        elapsed = setup_s + time.perf_counter() - start
+        _row(seed, "local search", solver, elapsed, len(validate(solver.itinerary())))
+
+
+def _row(seed: int, stage: str, solver: Solver, seconds: float, issues: int | None) -> None:
+    visited = [v for r in solver.routes for v in r.nodes]
+    travel = sum(solver.route_travel(r) for r in solver.routes)
+    priority = float(np.sum(solver.p.priority[visited]))
+    print(f"{seed:>4} {stage:>12} {len(visited):>7} {priority:>8.0f} {travel:>10.0f} {solver.score():>9.1f} {seconds:>7.2f} "
+          f"{'' if issues is None else issues:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Validator latency on a 30-day, 400-stop itinerary.
+
+    python scripts/bench_validator.py [--days 30 --stops 400 --limit-ms 100]
+
+Exits non-zero if a full validation takes longer than ``--limit-ms`` or a
+single-stop edit is not faster than a full validation.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+
+from opening_hours import hhmm
+from validator import Validator
+
+
+def synthetic_itinerary(days: int = 30, stops: int = 400, seed: int = 0) -> dict:
+    """A feasible trip around Paris: evenly spread stops, 15 min transfers, one hotel change a week."""
+    rng = random.Random(seed)
+    per_day = [stops // days + (1 if d < stops % days else 0) for d in range(days)]
+    out = {"budget": 10_000_000, "currency": "EUR", "days": []}
+    for d, count in enumerate(per_day):
+        hotel = {"name": f"Hotel {d // 7}", "lat": 48.85, "lon": 2.35, "check_in": "15:00", "check_out": "11:00", "cost": 150}
+        day_stops, t = [], 8 * 60
+        if d and d % 7 == 0:
+            day_stops.append({"name": "Check out", "type": "check_out", "start": "08:00", "end": "08:15"})
+            t = 8 * 60 + 15
+        visit = max(20, (14 * 60 - 15 * count) // max(count, 1))
+        for i in range(count):
+            t += 15
+            start, end = t, t + visit
+            day_stops.append({
+                "name": f"POI {d}-{i}", "start": hhmm(start), "end": hhmm(end),
+                "lat": 48.85 + rng.uniform(-0.003, 0.003), "lon": 2.35 + rng.uniform(-0.003, 0.003),
+                "opening_hours": [["07:00", "23:59"]], "cost": rng.choice([0, 5, 12, 20]),
+                "leg": {"duration_min": 10, "mode": "walk", "cost": 0},
+            })
+            t = end
+        out["days"].append({"date": f"2026-05-{d + 1:02d}", "hotel": hotel, "stops": day_stops})
+    return out
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--stops", type=int, default=400)
+    parser.add_argument("--limit-ms", type=float, default=100.0)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    itinerary = synthetic_itinerary(args.days, args.stops)
+    validator = Validator(itinerary)
+    assert validator.ok, [str(i) for i in validator.issues]
+    full_s = best_of(lambda: Validator(itinerary), args.repeat)
+
+    rng = random.Random(1)
+    day = rng.randrange(args.days)
+    stop = dict(itinerary["days"][day]["stops"][-1])
+    moved = dict(stop, start="03:00", end="03:30")  # before opening: one "closed" issue
+    edit_s = best_of(lambda: (validator.update_stop(day, len(itinerary["days"][day]["stops"]) - 1, moved),
+                              validator.update_stop(day, len(itinerary["days"][day]["stops"]) - 1, stop)), args.repeat) / 2
+    validator.update_stop(day, len(itinerary["days"][day]["stops"]) - 1, moved)
+    assert [i.kind for i in validator.issues] == ["closed"], [str(i) for i in validator.issues]
+
+    print(f"full validation   {args.days} days / {args.stops} stops: {full_s * 1e3:8.2f} ms (limit {args.limit_ms:.0f} ms)")
+    print(f"single-stop edit  (one day re-checked):     {edit_s * 1e3:8.3f} ms")
+    if full_s * 1e3 > args.limit_ms or edit_s >= full_s:
+        sys.exit("validator benchmark over budget")
+
+
+if __name__ == "__main__":
+    main()
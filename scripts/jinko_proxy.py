@@ -0,0 +1,239 @@
+"""Caching MCP proxy in front of a slow, rate-limited upstream server (the jinko hotel MCP).
+
+    python scripts/jinko_proxy.py --cache data/jinko-cache.sqlite -- npx jinko-mcp-dev
+
+Tool calls are keyed on their normalised arguments (key order,
+``2026/05/01`` vs ``2026-05-01`` and ``2.0`` vs ``2`` do not matter; case
+and whitespace only in the free-text fields named by ``--free-text``, so
+ids and tokens stay exact) and stored in SQLite with a TTL and LRU eviction.  Identical
+calls that arrive while one is already in flight share its upstream request.
+Only read-only tools matching ``--cacheable`` are cached; everything else
+(bookings and other side effects, and tools nobody has vetted yet) passes
+straight through.  The extra ``cache_stats`` tool reports hit/miss counts and latencies.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from mcp_stdio import Client, McpError, Server, text_result
+
+DEFAULT_CACHEABLE = r"^(search|get|list)_"
+LATENCY_SAMPLES = 10_000  # most recent calls kept for the percentiles
+DEFAULT_FREE_TEXT = "location,destination,city,region,country,address,query,name"
+FREE_TEXT = frozenset(DEFAULT_FREE_TEXT.split(","))
+_DATE = re.compile(r"^(\d{4})[/.](\d{1,2})[/.](\d{1,2})$")
+
+
+def normalise(value, free_text: frozenset[str] = FREE_TEXT, fold: bool = False):
+    """Canonical form of tool arguments for cache keys; only strings under ``free_text`` keys are case-folded."""
+    if isinstance(value, dict):
+        return {k: normalise(v, free_text, k in free_text) for k, v in sorted(value.items()) if v not in (None, "", [], {})}
+    if isinstance(value, list):
+        return [normalise(v, free_text, fold) for v in value]
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        if m := _DATE.match(value.strip()):
+            return f"{int(m[1]):04d}-{int(m[2]):02d}-{int(m[3]):02d}"
+        return " ".join(value.split()).lower() if fold else value
+    return value
+
+
+def cache_key(tool: str, arguments: dict, free_text: frozenset[str] = FREE_TEXT) -> str:
+    canonical = json.dumps([tool, normalise(arguments, free_text)], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed tool results with TTL expiry and least-recently-used eviction."""
+
+    def __init__(self, path: str, ttl_s: float = 900.0, max_entries: int = 5000) -> None:
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, tool TEXT NOT NULL, result TEXT NOT NULL,"
+            " created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self.db.commit()
+
+    def get(self, key: str) -> dict | None:
+        now = time.time()
+        row = self.db.execute("SELECT result, created FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if now - row[1] > self.ttl_s:
+            self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.db.commit()
+            return None
+        self.db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        self.db.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, tool: str, result: dict) -> None:
+        now = time.time()
+        self.db.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+            (key, tool, json.dumps(result, ensure_ascii=False), now, now),
+        )
+        self.db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_s,))
+        (count,) = self.db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count > self.max_entries:
+            self.db.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                (count - self.max_entries,),
+            )
+        self.db.commit()
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+@dataclass
+class Metrics:
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    passthrough: int = 0
+    upstream_errors: int = 0
+    hit_ms: deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES))
+    upstream_ms: deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES))
+
+    def summary(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits, "misses": self.misses, "coalesced": self.coalesced,
+            "passthrough": self.passthrough, "upstream_errors": self.upstream_errors,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 3) if lookups else None,
+            "hit_ms": _percentiles(self.hit_ms), "upstream_ms": _percentiles(self.upstream_ms),
+        }
+
+
+def _percentiles(samples: deque[float]) -> dict | None:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 2)
+
+    return {"p50": pick(0.5), "p95": pick(0.95), "max": round(ordered[-1], 2), "n": len(ordered)}
+
+
+class CachingProxy(Server):
+    def __init__(self, upstream: Client, cache: ResponseCache, cacheable: str = DEFAULT_CACHEABLE,
+                 record: str | None = None, free_text: str = DEFAULT_FREE_TEXT) -> None:
+        super().__init__("jinko-cache")
+        self.upstream = upstream
+        self.cache = cache
+        self.free_text = frozenset(k.strip() for k in free_text.split(",") if k.strip())
+        self.cacheable = re.compile(cacheable, re.IGNORECASE) if cacheable else None
+        self.record = record
+        self.metrics = Metrics()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._upstream_tools: list[dict] | None = None
+
+        @self.tool("Hit/miss counts and latency percentiles of the caching proxy.", {"type": "object", "properties": {}})
+        def cache_stats() -> dict:
+            return {**self.metrics.summary(), "entries": len(self.cache)}
+
+    async def list_tools(self) -> list[dict]:
+        if self._upstream_tools is None:
+            self._upstream_tools = await self.upstream.list_tools()
+        return self._upstream_tools + await super().list_tools()
+
+    async def call_tool(self, name: str, arguments: dict) -> dict:
+        if name in self._tools:
+            return await super().call_tool(name, arguments)
+        if self.cacheable is None or not self.cacheable.search(name):
+            self.metrics.passthrough += 1
+            return await self._upstream_call(name, arguments)
+
+        start = time.perf_counter()
+        key = cache_key(name, arguments, self.free_text)
+        if (cached := self.cache.get(key)) is not None:
+            self.metrics.hits += 1
+            self.metrics.hit_ms.append((time.perf_counter() - start) * 1e3)
+            return cached
+        if (inflight := self._inflight.get(key)) is not None:
+            self.metrics.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        self.metrics.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._upstream_call(name, arguments)
+            if not result.get("isError"):
+                self.cache.put(key, name, result)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # followers may not exist; don't warn about it being unretrieved
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _upstream_call(self, name: str, arguments: dict) -> dict:
+        start = time.perf_counter()
+        try:
+            result = await self.upstream.call_tool(name, arguments)
+        except McpError as exc:
+            self.metrics.upstream_errors += 1
+            return text_result(f"upstream error: {exc}", is_error=True)
+        self.metrics.upstream_ms.append((time.perf_counter() - start) * 1e3)
+        if self.record:
+            with open(self.record, "a") as f:
+                f.write(json.dumps({"tool": name, "arguments": arguments, "result": result}, ensure_ascii=False) + "\n")
+        return result
+
+
+async def _main(args: argparse.Namespace) -> None:
+    upstream = await Client.spawn(args.upstream)
+    proxy = CachingProxy(upstream, ResponseCache(args.cache, args.ttl, args.max_entries), args.cacheable, args.record, args.free_text)
+    try:
+        await proxy.serve()
+    finally:
+        await upstream.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cache", default="data/jinko-cache.sqlite", help="SQLite cache file")
+    parser.add_argument("--ttl", type=float, default=900.0, help="seconds a response stays fresh")
+    parser.add_argument("--max-entries", type=int, default=5000)
+    parser.add_argument("--cacheable", default=DEFAULT_CACHEABLE,
+                        help="regex of read-only tool names to cache; all other tools pass through")
+    parser.add_argument("--free-text", default=DEFAULT_FREE_TEXT,
+                        help="comma-separated argument names whose case and whitespace are ignored")
+    parser.add_argument("--record", help="append upstream responses to this JSONL file (for offline fixtures)")
+    parser.add_argument("upstream", nargs=argparse.REMAINDER, help="-- upstream server command")
+    args = parser.parse_args()
+    if args.upstream[:1] == ["--"]:
+        args.upstream = args.upstream[1:]
+    if not args.upstream:
+        parser.error("missing upstream server command")
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Batched N x M travel-time / distance matrices on top of the CH index.
+
+Destination search spaces are merged into per-node buckets once; origins are
+then split across a process pool, each worker running one upward search per
+origin and scanning the buckets with NumPy.  A long-lived caller (the MCP
+server) keeps one ``MatrixPool`` so workers start and open the index once.
+Results are kept in an on-disk cache and addressed by a handle, so the
+solver can reuse a matrix without recomputing it (``solver.py
+--matrix-handle``).
+
+    python scripts/matrix.py data/city.ch points.json   # {"origins": [[lat, lon], ...], "destinations": [...]}
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+from routing import Point, RoutingIndex
+
+# Below this many origins the pool start-up costs more than it saves.
+MIN_PARALLEL_ORIGINS = 32
+
+
+@dataclass
+class Matrix:
+    """``durations[i, j]`` seconds and ``distances[i, j]`` metres from origin i to destination j (inf if unreachable)."""
+
+    handle: str
+    origins: np.ndarray
+    destinations: np.ndarray
+    durations: np.ndarray
+    distances: np.ndarray
+
+    def to_json(self) -> dict:
+        def rows(a: np.ndarray) -> list[list[float | None]]:
+            return [[None if np.isinf(x) else round(float(x), 1) for x in row] for row in a]
+
+        return {"handle": self.handle, "durations_s": rows(self.durations), "distances_m": rows(self.distances)}
+
+
+class MatrixCache:
+    """Directory of ``<handle>.npz`` files."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, handle: str) -> str:
+        return os.path.join(self.directory, f"{handle}.npz")
+
+    def get(self, handle: str) -> Matrix | None:
+        try:
+            with np.load(self._path(handle)) as data:
+                return Matrix(handle, data["origins"], data["destinations"], data["durations"], data["distances"])
+        except FileNotFoundError:
+            return None
+
+    def put(self, matrix: Matrix) -> None:
+        tmp = self._path(matrix.handle) + ".tmp.npz"
+        np.savez(tmp, origins=matrix.origins, destinations=matrix.destinations,
+                 durations=matrix.durations, distances=matrix.distances)
+        os.replace(tmp, self._path(matrix.handle))
+
+
+class MatrixPool:
+    """Worker processes kept across matrices; started on first use."""
+
+    def __init__(self, workers: int | None = None) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self._executor: ProcessPoolExecutor | None = None
+
+    def map(self, fn, items: list) -> list:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers)
+        return list(self._executor.map(fn, items))
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> "MatrixPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def default_cache_dir(index_path: str) -> str:
+    """``<index>.matrices`` next to the index: where the routing server and the solver meet."""
+    return os.path.splitext(index_path)[0] + ".matrices"
+
+
+def matrix_handle(index_path: str, origins: Sequence[Point], destinations: Sequence[Point]) -> str:
+    stat = os.stat(index_path)
+    h = hashlib.sha1(f"{os.path.abspath(index_path)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    h.update(np.round(np.asarray(origins, dtype=np.float64), 6).tobytes())
+    h.update(b"|")
+    h.update(np.round(np.asarray(destinations, dtype=np.float64), 6).tobytes())
+    return h.hexdigest()[:20]
+
+
+def distance_matrix(
+    index: RoutingIndex,
+    origins: Sequence[Point],
+    destinations: Sequence[Point],
+    cache: MatrixCache | None = None,
+    workers: int | None = None,
+    pool: MatrixPool | None = None,
+) -> Matrix:
+    """Without ``pool`` a large matrix starts (and stops) a pool of ``workers`` processes of its own."""
+    handle = matrix_handle(index.path, origins, destinations)
+    if cache is not None and (hit := cache.get(handle)) is not None:
+        return hit
+
+    sources = [index.nearest(p) for p in origins]
+    buckets = _buckets(index, [index.nearest(p) for p in destinations])
+    workers = pool.workers if pool is not None else workers or os.cpu_count() or 1
+    if workers == 1 or len(sources) < MIN_PARALLEL_ORIGINS:
+        durations, distances = _rows(index, buckets, len(destinations), sources)
+    else:
+        chunks = [sources[i::workers] for i in range(workers)]
+        task = functools.partial(_pool_rows, index.path, buckets, len(destinations))
+        if pool is None:
+            with MatrixPool(workers) as own:
+                parts = own.map(task, chunks)
+        else:
+            parts = pool.map(task, chunks)
+        durations = np.empty((len(sources), len(destinations)))
+        distances = np.empty_like(durations)
+        for k, (t, d) in enumerate(parts):
+            durations[k::workers], distances[k::workers] = t, d
+
+    matrix = Matrix(handle, np.asarray(origins, dtype=np.float64).reshape(-1, 2),
+                    np.asarray(destinations, dtype=np.float64).reshape(-1, 2), durations, distances)
+    if cache is not None:
+        cache.put(matrix)
+    return matrix
+
+
+def _buckets(index: RoutingIndex, targets: list[int]) -> dict[int, tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """``node -> (destination columns, seconds, metres)`` from every destination's backward search."""
+    lists: dict[int, tuple[list, list, list]] = {}
+    for j, t in enumerate(targets):
+        for v, tm, dm in index.backward_space(t):
+            cols, times, dists = lists.setdefault(v, ([], [], []))
+            cols.append(j)
+            times.append(tm)
+            dists.append(dm)
+    return {
+        v: (np.array(cols, dtype=np.intp), np.array(times), np.array(dists))
+        for v, (cols, times, dists) in lists.items()
+    }
+
+
+# the index a pool worker process keeps open between tasks; never used in the caller's process,
+# where concurrent matrices (the routing server runs them in threads) must not share state
+_worker: dict = {}
+
+
+def _pool_rows(index_path: str, buckets: dict, width: int, sources: Sequence[int]) -> tuple[np.ndarray, np.ndarray]:
+    """Pool task: the worker keeps its index open between matrices unless the file changed."""
+    stamp = os.stat(index_path).st_mtime_ns
+    index = _worker.get("index")
+    if index is None or index.path != index_path or _worker.get("stamp") != stamp:
+        if index is not None:
+            index.close()
+        index = _worker["index"] = RoutingIndex(index_path)
+        _worker["stamp"] = stamp
+    return _rows(index, buckets, width, sources)
+
+
+def _rows(index: RoutingIndex, buckets: dict, width: int, sources: Sequence[int]) -> tuple[np.ndarray, np.ndarray]:
+    durations = np.full((len(sources), width), np.inf)
+    distances = np.full((len(sources), width), np.inf)
+    for i, s in enumerate(sources):
+        best_t, best_d = durations[i], distances[i]
+        for v, tm, dm in index.forward_space(s):
+            bucket = buckets.get(v)
+            if bucket is None:
+                continue
+            cols, bt, bd = bucket
+            candidate = bt + tm
+            better = candidate < best_t[cols]
+            if better.any():
+                cols = cols[better]
+                best_t[cols] = candidate[better]
+                best_d[cols] = bd[better] + dm
+    return durations, distances
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("index")
+    parser.add_argument("points", help="JSON file with origins and destinations as [lat, lon] pairs")
+    parser.add_argument("--cache-dir", default="data/matrix-cache")
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+    with open(args.points) as f:
+        points = json.load(f)
+    matrix = distance_matrix(RoutingIndex(args.index), points["origins"], points["destinations"],
+                             MatrixCache(args.cache_dir), args.workers)
+    print(json.dumps(matrix.to_json()))
+
+
+if __name__ == "__main__":
+    main()
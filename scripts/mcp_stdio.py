@@ -0,0 +1,208 @@
+"""Minimal MCP server and client over stdio (newline-delimited JSON-RPC 2.0).
+
+Just enough of the protocol for the local tool servers in this repo:
+``initialize``, ``ping``, ``tools/list`` and ``tools/call``.  Requests are
+handled concurrently so async tools can overlap; the client multiplexes
+concurrent calls to one upstream server process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import itertools
+import json
+import os
+import sys
+import traceback
+from typing import Any, Callable
+
+PROTOCOL_VERSION = "2025-06-18"
+
+
+class Server:
+    def __init__(self, name: str, version: str = "0.1.0") -> None:
+        self.name = name
+        self.version = version
+        self._tools: dict[str, tuple[dict, Callable]] = {}
+        self._write_lock = asyncio.Lock()
+
+    def tool(self, description: str, input_schema: dict, name: str | None = None):
+        """Register ``fn(**arguments)`` as a tool; it may be sync or async."""
+
+        def decorator(fn: Callable) -> Callable:
+            tool_name = name or fn.__name__
+            self._tools[tool_name] = (
+                {"name": tool_name, "description": description, "inputSchema": input_schema},
+                fn,
+            )
+            return fn
+
+        return decorator
+
+    async def list_tools(self) -> list[dict]:
+        return [spec for spec, _ in self._tools.values()]
+
+    async def call_tool(self, name: str, arguments: dict) -> dict:
+        """Return an MCP ``CallToolResult``."""
+        if name not in self._tools:
+            return text_result(f"unknown tool: {name}", is_error=True)
+        fn = self._tools[name][1]
+        try:
+            result = fn(**arguments)
+            if inspect.isawaitable(result):
+                result = await result
+        except Exception as exc:  # reported to the client, not fatal to the server
+            traceback.print_exc(file=sys.stderr)
+            return text_result(f"{type(exc).__name__}: {exc}", is_error=True)
+        return text_result(json.dumps(result, ensure_ascii=False))
+
+    async def handle(self, message: dict) -> dict | None:
+        method = message.get("method")
+        params = message.get("params") or {}
+        if "id" not in message:
+            return None  # notification
+        if method == "initialize":
+            result: Any = {
+                "protocolVersion": params.get("protocolVersion", PROTOCOL_VERSION),
+                "capabilities": {"tools": {}},
+                "serverInfo": {"name": self.name, "version": self.version},
+            }
+        elif method == "ping":
+            result = {}
+        elif method == "tools/list":
+            result = {"tools": await self.list_tools()}
+        elif method == "tools/call":
+            result = await self.call_tool(params["name"], params.get("arguments") or {})
+        else:
+            return {
+                "jsonrpc": "2.0",
+                "id": message["id"],
+                "error": {"code": -32601, "message": f"method not found: {method}"},
+            }
+        return {"jsonrpc": "2.0", "id": message["id"], "result": result}
+
+    async def _respond(self, message: dict) -> None:
+        response = await self.handle(message)
+        if response is not None:
+            async with self._write_lock:
+                sys.stdout.write(json.dumps(response, ensure_ascii=False) + "\n")
+                sys.stdout.flush()
+
+    async def serve(self) -> None:
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=1 << 24)
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        pending: set[asyncio.Task] = set()
+        while line := await reader.readline():
+            if not line.strip():
+                continue
+            task = asyncio.create_task(self._respond(json.loads(line)))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending)
+
+    def run(self) -> None:
+        asyncio.run(self.serve())
+
+
+class McpError(Exception):
+    """A JSON-RPC error response from an upstream server, or the server went away."""
+
+
+class Client:
+    """Talks to an MCP server subprocess; ``request`` may be awaited concurrently."""
+
+    def __init__(self, process: asyncio.subprocess.Process) -> None:
+        self.process = process
+        self._ids = itertools.count(1)
+        self._pending: dict[int, asyncio.Future] = {}
+        self._write_lock = asyncio.Lock()
+        self._reader: asyncio.Task | None = None
+
+    @classmethod
+    async def spawn(cls, command: list[str], env: dict[str, str] | None = None) -> "Client":
+        process = await asyncio.create_subprocess_exec(
+            *command, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+            env={**os.environ, **(env or {})}, limit=1 << 24,
+        )
+        client = cls(process)
+        client._reader = asyncio.create_task(client._read_loop())
+        await client.request("initialize", {
+            "protocolVersion": PROTOCOL_VERSION,
+            "capabilities": {},
+            "clientInfo": {"name": "tourism-skills", "version": "0.1.0"},
+        })
+        await client._send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        return client
+
+    async def _send(self, message: dict) -> None:
+        async with self._write_lock:
+            self.process.stdin.write((json.dumps(message, ensure_ascii=False) + "\n").encode())
+            await self.process.stdin.drain()
+
+    async def request(self, method: str, params: dict | None = None) -> Any:
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        if params is not None:
+            message["params"] = params
+        await self._send(message)
+        return await future
+
+    async def _read_loop(self) -> None:
+        while line := await self.process.stdout.readline():
+            if not line.strip():
+                continue
+            message = json.loads(line)
+            if "method" in message:
+                if "id" in message:  # server-to-client requests (sampling, roots...) are not supported
+                    await self._send({"jsonrpc": "2.0", "id": message["id"],
+                                      "error": {"code": -32601, "message": "not supported"}})
+                continue
+            future = self._pending.pop(message.get("id"), None)
+            if future is None or future.done():
+                continue
+            if "error" in message:
+                future.set_exception(McpError(message["error"].get("message", "error")))
+            else:
+                future.set_result(message.get("result"))
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(McpError("upstream server exited"))
+        self._pending.clear()
+
+    async def list_tools(self) -> list[dict]:
+        tools, cursor = [], None
+        while True:
+            result = await self.request("tools/list", {"cursor": cursor} if cursor else {})
+            tools.extend(result.get("tools", []))
+            cursor = result.get("nextCursor")
+            if not cursor:
+                return tools
+
+    async def call_tool(self, name: str, arguments: dict) -> dict:
+        return await self.request("tools/call", {"name": name, "arguments": arguments})
+
+    async def close(self) -> None:
+        self.process.stdin.close()
+        try:
+            await asyncio.wait_for(self.process.wait(), 5)
+        except asyncio.TimeoutError:
+            self.process.kill()
+            await self.process.wait()
+        if self._reader is not None:
+            await self._reader
+
+
+def text_result(text: str, is_error: bool = False) -> dict:
+    return {"content": [{"type": "text", "text": text}], "isError": is_error}
+
+
+POINT_SCHEMA = {
+    "type": "object",
+    "properties": {"lat": {"type": "number"}, "lon": {"type": "number"}},
+    "required": ["lat", "lon"],
+}
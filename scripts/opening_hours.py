@@ -0,0 +1,143 @@
+"""Opening hours as ``{"mon": [["09:00", "18:00"], ...], ...}`` (the solver's per-weekday format).
+
+Parses the OSM ``opening_hours`` syntax most POIs use (``Mo-Fr 09:00-18:00;
+Sa 10:00-14:00``, ``24/7``, ``off``) and schema.org opening hours.  Rules
+with public-holiday, month or week selectors are skipped rather than guessed.
+
+For bulk filtering a week is also encoded as a bitmask of quarter-hour slots
+(``week_mask``), so "open at T" is a single bit test (``is_open``).
+"""
+
+from __future__ import annotations
+
+import datetime
+import re
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+_OSM_DAYS = {"mo": 0, "tu": 1, "we": 2, "th": 3, "fr": 4, "sa": 5, "su": 6}
+_SCHEMA_DAYS = {name: i for i, name in enumerate(("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"))}
+_TIME_RANGE = re.compile(r"^(\d{1,2}):(\d{2})-(\d{1,2}):(\d{2})$")
+_DAY_SPEC = re.compile(r"^(mo|tu|we|th|fr|sa|su)(?:-(mo|tu|we|th|fr|sa|su))?$")
+
+Hours = dict[str, list[list[str]]]
+
+SLOT_MIN = 15
+WEEK_SLOTS = 7 * 24 * 60 // SLOT_MIN  # 672
+MASK_BYTES = WEEK_SLOTS // 8  # 84
+
+
+def parse_osm(text: str) -> Hours | None:
+    """Weekly hours from an OSM ``opening_hours`` value; None if nothing could be understood."""
+    text = text.strip()
+    if text == "24/7":
+        return {d: [["00:00", "24:00"]] for d in WEEKDAYS}
+    hours: Hours = {}
+    understood = False
+    for rule in filter(None, (r.strip() for r in text.split(";"))):
+        days, times = _split_rule(rule.lower())
+        if days is None:
+            continue
+        if times in ("off", "closed"):
+            for d in days:
+                hours.pop(WEEKDAYS[d], None)
+            understood = True
+            continue
+        windows = []
+        for part in times.replace(" ", "").split(","):
+            m = _TIME_RANGE.match(part)
+            if m is None:
+                windows = []
+                break
+            windows.append([f"{int(m[1]):02d}:{m[2]}", f"{int(m[3]):02d}:{m[4]}"])
+        if not windows:
+            continue
+        understood = True
+        for d in days:
+            hours[WEEKDAYS[d]] = [list(w) for w in windows]  # later rules override earlier ones
+    return hours if understood else None
+
+
+def _split_rule(rule: str) -> tuple[list[int] | None, str]:
+    head, _, rest = rule.partition(" ")
+    if _TIME_RANGE.match(head.split(",")[0]) or head in ("off", "closed"):
+        return list(range(7)), rule
+    days: list[int] = []
+    for spec in head.split(","):
+        m = _DAY_SPEC.match(spec)
+        if m is None:
+            return None, ""
+        a = _OSM_DAYS[m[1]]
+        b = _OSM_DAYS[m[2]] if m[2] else a
+        days.extend(range(a, b + 1) if a <= b else [*range(a, 7), *range(0, b + 1)])
+    return days, rest.strip()
+
+
+def parse_schema_org(spec: list | dict) -> Hours:
+    """Weekly hours from schema.org ``openingHoursSpecification`` entries."""
+    hours: Hours = {}
+    for entry in spec if isinstance(spec, list) else [spec]:
+        days = entry.get("dayOfWeek") or []
+        opens, closes = entry.get("opens"), entry.get("closes")
+        if not opens or not closes:
+            continue
+        for day in days if isinstance(days, list) else [days]:
+            index = _SCHEMA_DAYS.get(str(day).rsplit("/", 1)[-1].lower())
+            if index is not None:
+                hours.setdefault(WEEKDAYS[index], []).append([opens[:5], closes[:5]])
+    return hours
+
+
+# --------------------------------------------------------------------------- bitmask
+
+
+def week_mask(hours: Hours) -> bytes:
+    """Slot ``s`` is set when the place is open at the start of that quarter hour.
+
+    Windows closing before they open (``22:00-02:00``) run into the next day,
+    Sunday night wraps to Monday.
+    """
+    bits = bytearray(MASK_BYTES)
+    for d, day in enumerate(WEEKDAYS):
+        for opens, closes in hours.get(day, []):
+            a, b = d * 1440 + _minute(opens), d * 1440 + _minute(closes)
+            if b <= a:
+                b += 1440
+            for s in range(-(-a // SLOT_MIN), -(-b // SLOT_MIN)):
+                s %= WEEK_SLOTS
+                bits[s >> 3] |= 1 << (s & 7)
+    return bytes(bits)
+
+
+def week_slot(when: datetime.datetime) -> int:
+    return when.weekday() * (WEEK_SLOTS // 7) + (when.hour * 60 + when.minute) // SLOT_MIN
+
+
+def is_open(mask: bytes, slot: int) -> bool:
+    return bool(mask[slot >> 3] >> (slot & 7) & 1)
+
+
+def mask_hours(mask: bytes) -> Hours:
+    """Weekly hours back from a mask, to the quarter hour (windows split at midnight)."""
+    hours: Hours = {}
+    per_day = WEEK_SLOTS // 7
+    for d, day in enumerate(WEEKDAYS):
+        start = None
+        for i in range(per_day + 1):
+            on = i < per_day and is_open(mask, d * per_day + i)
+            if on and start is None:
+                start = i
+            elif not on and start is not None:
+                hours.setdefault(day, []).append([hhmm(start * SLOT_MIN), hhmm(i * SLOT_MIN)])
+                start = None
+    return hours
+
+
+def _minute(text: str) -> int:
+    h, m = text.split(":")
+    return int(h) * 60 + int(m)
+
+
+def hhmm(m: float) -> str:
+    """``HH:MM`` for a minute of the day (past midnight keeps counting: 1500 -> ``25:00``)."""
+    m = int(m)
+    return f"{m // 60:02d}:{m % 60:02d}"
@@ -0,0 +1,65 @@
+"""Streaming reader for OpenStreetMap extracts.
+
+``.osm`` / ``.osm.bz2`` XML files are read with the standard library.
+``.pbf`` files need ``pyosmium`` (``pip install osmium``).
+"""
+
+from __future__ import annotations
+
+import bz2
+from dataclasses import dataclass, field
+from typing import Iterator
+from xml.etree import ElementTree
+
+
+@dataclass
+class Node:
+    id: int
+    lat: float
+    lon: float
+    tags: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Way:
+    id: int
+    refs: list[int]
+    tags: dict[str, str] = field(default_factory=dict)
+
+
+def read_osm(path: str) -> Iterator[Node | Way]:
+    """Yield nodes and ways from an OSM extract in file order."""
+    if path.endswith(".pbf"):
+        yield from _read_pbf(path)
+    else:
+        yield from _read_xml(path)
+
+
+def _read_xml(path: str) -> Iterator[Node | Way]:
+    opener = bz2.open if path.endswith(".bz2") else open
+    with opener(path, "rb") as f:
+        for _, elem in ElementTree.iterparse(f, events=("end",)):
+            if elem.tag == "node":
+                tags = {t.get("k"): t.get("v") for t in elem.iter("tag")}
+                yield Node(int(elem.get("id")), float(elem.get("lat")), float(elem.get("lon")), tags)
+                elem.clear()
+            elif elem.tag == "way":
+                refs = [int(nd.get("ref")) for nd in elem.iter("nd")]
+                tags = {t.get("k"): t.get("v") for t in elem.iter("tag")}
+                yield Way(int(elem.get("id")), refs, tags)
+                elem.clear()
+            elif elem.tag == "relation":
+                elem.clear()
+
+
+def _read_pbf(path: str) -> Iterator[Node | Way]:
+    try:
+        import osmium
+    except ImportError as exc:
+        raise SystemExit("reading .pbf extracts needs pyosmium: pip install osmium") from exc
+    for obj in osmium.FileProcessor(path):
+        if obj.is_node():
+            if obj.location.valid():
+                yield Node(obj.id, obj.location.lat, obj.location.lon, dict(obj.tags))
+        elif obj.is_way():
+            yield Way(obj.id, [n.ref for n in obj.nodes], dict(obj.tags))
@@ -0,0 +1,95 @@
+"""Local MCP server answering travel-time queries from a prebuilt CH index.
+
+    python scripts/osm_routing_server.py data/city.ch
+
+Build the index first with ``python scripts/routing.py build``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+
+from matrix import MatrixCache, MatrixPool, default_cache_dir, distance_matrix
+from mcp_stdio import POINT_SCHEMA, Server
+from routing import Leg, RoutingIndex
+
+
+def _leg(leg: Leg | None) -> dict | None:
+    if leg is None:
+        return None
+    return {"duration_s": round(leg.duration_s, 1), "distance_m": round(leg.distance_m, 1)}
+
+
+def _point(p: dict) -> tuple[float, float]:
+    return float(p["lat"]), float(p["lon"])
+
+
+def create_server(index: RoutingIndex, cache: MatrixCache, workers: int | None = None) -> Server:
+    server = Server("osm-routing")
+    pool = MatrixPool(workers)  # one per server: workers start and open the index once, not per matrix
+
+    @server.tool(
+        "Travel time and distance between two points (null if unreachable).",
+        {
+            "type": "object",
+            "properties": {"origin": POINT_SCHEMA, "destination": POINT_SCHEMA},
+            "required": ["origin", "destination"],
+        },
+    )
+    def travel_time(origin: dict, destination: dict) -> dict | None:
+        return _leg(index.travel_time(_point(origin), _point(destination)))
+
+    @server.tool(
+        "Travel times from one origin to many destinations, in destination order.",
+        {
+            "type": "object",
+            "properties": {
+                "origin": POINT_SCHEMA,
+                "destinations": {"type": "array", "items": POINT_SCHEMA},
+            },
+            "required": ["origin", "destinations"],
+        },
+    )
+    def travel_times(origin: dict, destinations: list[dict]) -> list[dict | None]:
+        legs = index.one_to_many(_point(origin), [_point(p) for p in destinations])
+        return [_leg(leg) for leg in legs]
+
+    @server.tool(
+        "N x M travel-time (s) and distance (m) matrix, null where unreachable. "
+        "Returns a handle; pass it back as `handle` to fetch the cached matrix again.",
+        {
+            "type": "object",
+            "properties": {
+                "origins": {"type": "array", "items": POINT_SCHEMA},
+                "destinations": {"type": "array", "items": POINT_SCHEMA},
+                "handle": {"type": "string"},
+            },
+        },
+    )
+    async def travel_time_matrix(origins: list[dict] = (), destinations: list[dict] = (), handle: str | None = None) -> dict:
+        if handle is not None:
+            matrix = cache.get(handle)
+            if matrix is None:
+                raise KeyError(f"no cached matrix {handle}")
+        else:
+            # off the event loop, so other tool calls are answered while a large matrix is computed
+            matrix = await asyncio.to_thread(distance_matrix, index, [_point(p) for p in origins],
+                                             [_point(p) for p in destinations], cache, pool=pool)
+        return matrix.to_json()
+
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("index", help="routing index built by routing.py")
+    parser.add_argument("--cache-dir", help="matrix cache (default: <index>.matrices next to the index)")
+    parser.add_argument("--workers", type=int, help="matrix worker processes (default: CPU count)")
+    args = parser.parse_args()
+    cache = MatrixCache(args.cache_dir or default_cache_dir(args.index))
+    create_server(RoutingIndex(args.index), cache, args.workers).run()
+
+
+if __name__ == "__main__":
+    main()
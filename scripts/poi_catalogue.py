@@ -0,0 +1,600 @@
+"""Local POI catalogue: spatial, text and opening-hours queries over an on-disk file.
+
+    python scripts/poi_catalogue.py build data/france.osm.pbf data/pois.cat [--scraped data/scrape.sqlite]
+    python scripts/poi_catalogue.py query data/pois.cat 48.8606,2.3376 --radius 800 --category museum --open-at 2026-05-02T10:00
+    python scripts/poi_catalogue.py query data/pois.cat 48.8606,2.3376 -k 5 --text "louvre"
+
+A POI is an OSM node or way with a name and one of ``CATEGORY_KEYS``; ways
+are placed at the mean of their nodes.  Scraped opening hours, prices and
+availability (``scrape.py`` result store) are joined on the website URL and
+override OSM opening hours.
+
+The file is columnar: a header, a section table and 8-byte aligned numpy
+arrays, memory-mapped on open so only the pages a query touches are read.
+
+* POIs are stored in sort-tile-recursive order and a packed R-tree
+  (``NODE_SIZE`` children per node, boxes in 1e-7 degrees) sits on top, so
+  the leaves are contiguous runs of POIs.  Box, radius and k-nearest
+  queries walk it level by level with vectorised box tests.
+* Name words and selected tags (``amenity=museum``, ``museum``) go into an
+  inverted index with sorted ``uint32`` postings; misspelt words are matched
+  through a trigram index over the vocabulary plus a bounded edit distance.
+* Opening hours are deduplicated weekly bitmasks (``opening_hours.week_mask``);
+  each POI stores the pattern number, so "open at T" is a bit test.
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import datetime
+import heapq
+import json
+import math
+import mmap
+import re
+import sqlite3
+import struct
+import sys
+import unicodedata
+import zlib
+from array import array
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from opening_hours import MASK_BYTES, WEEK_SLOTS, Hours, mask_hours, parse_osm, week_mask, week_slot
+from osm import Node, Way, read_osm
+from routing import Point
+
+MAGIC = b"TSKPOI01"
+HEADER = struct.Struct("<8sII")  # magic, POI count, section count
+SECTION = struct.Struct("<16s8sQQ")  # name, numpy dtype, byte offset, element count
+
+NODE_SIZE = 16
+E7 = 1e7
+EARTH_RADIUS_M = 6_371_000.0
+CATEGORY_KEYS = ("tourism", "amenity", "leisure", "historic", "shop")
+INDEXED_TAGS = CATEGORY_KEYS + ("cuisine", "sport", "museum", "attraction")
+AVAILABILITY = ("", "available", "sold_out")
+WEBSITE_KEYS = ("website", "contact:website", "url")
+_WORD = re.compile(r"\w+")
+
+
+@dataclass
+class Poi:
+    name: str
+    lat: float
+    lon: float
+    category: str
+    tags: dict[str, str] = field(default_factory=dict)
+    hours: Hours | None = None
+    price: float | None = None
+    availability: str | None = None
+
+    def to_json(self) -> dict:
+        """A solver POI (``solver.py`` problem format)."""
+        out = {"name": self.name, "lat": self.lat, "lon": self.lon, "category": self.category}
+        if self.hours is not None:
+            out["opening_hours"] = self.hours
+        if self.price is not None:
+            out["cost"] = self.price
+        if self.availability:
+            out["availability"] = self.availability
+        return out
+
+
+def tokens(text: str) -> list[str]:
+    """Lower-case words with accents stripped."""
+    if not text.isascii():
+        text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return _WORD.findall(text.lower())
+
+
+# --------------------------------------------------------------------------- sources
+
+
+def pois_from_osm(path: str, scraped: str | None = None) -> Iterator[Poi]:
+    """POIs from an OSM extract, two passes so way centroids only keep the nodes they need."""
+    wanted = array("q")
+    for obj in read_osm(path):
+        if isinstance(obj, Way) and _category(obj.tags):
+            wanted.extend(obj.refs)
+    needed = np.unique(np.frombuffer(wanted, dtype=np.int64))
+    del wanted
+    coords: dict[int, Point] = {}
+    pages = _scraped_pages(scraped) if scraped else {}
+    for obj in read_osm(path):
+        if isinstance(obj, Node):
+            i = np.searchsorted(needed, obj.id)
+            if i < len(needed) and needed[i] == obj.id:
+                coords[obj.id] = (obj.lat, obj.lon)
+            if _category(obj.tags):
+                yield _poi(obj.tags, obj.lat, obj.lon, pages)
+        elif _category(obj.tags):
+            points = [coords[r] for r in obj.refs if r in coords]
+            if points:
+                yield _poi(obj.tags, sum(p[0] for p in points) / len(points), sum(p[1] for p in points) / len(points), pages)
+
+
+def _category(tags: dict[str, str]) -> str | None:
+    if "name" not in tags:
+        return None
+    for key in CATEGORY_KEYS:
+        if key in tags:
+            return f"{key}={tags[key]}"
+    return None
+
+
+def _poi(tags: dict[str, str], lat: float, lon: float, pages: dict[str, sqlite3.Row]) -> Poi:
+    hours = parse_osm(tags["opening_hours"]) if "opening_hours" in tags else None
+    poi = Poi(tags["name"], lat, lon, _category(tags), tags, hours)
+    for key in WEBSITE_KEYS:
+        page = pages.get(_site(tags.get(key, "")))
+        if page is not None:
+            if page["opening_hours"]:
+                poi.hours = json.loads(page["opening_hours"])
+            poi.price, poi.availability = page["price"], page["availability"]
+            break
+    return poi
+
+
+def _scraped_pages(path: str) -> dict[str, sqlite3.Row]:
+    db = sqlite3.connect(path)
+    db.row_factory = sqlite3.Row
+    rows = db.execute("SELECT url, opening_hours, price, availability FROM pages WHERE error IS NULL").fetchall()
+    db.close()
+    return {_site(row["url"]): row for row in rows}
+
+
+def _site(url: str) -> str:
+    if not url:
+        return ""
+    parts = urlsplit(url if "//" in url else "//" + url)
+    return parts.netloc.lower().removeprefix("www.") + parts.path.rstrip("/")
+
+
+# --------------------------------------------------------------------------- build
+
+
+def build_catalogue(pois: Iterable[Poi], path: str) -> int:
+    """Write the catalogue; returns the number of POIs."""
+    lat, lon = array("i"), array("i")
+    names: list[str] = []
+    tags: list[str] = []
+    categories: dict[str, int] = {}
+    category = array("H")
+    patterns: dict[bytes, int] = {b"": 0}  # pattern 0: hours unknown
+    pattern_of: dict[str, int] = {}  # most POIs share a few schedules; encode each once
+    hours = array("I")
+    price = array("f")
+    availability = array("B")
+    vocabulary: dict[str, int] = {}
+    term_ids, poi_ids = array("I"), array("I")
+    for poi in pois:
+        for word in _words(poi):
+            term_ids.append(vocabulary.setdefault(word, len(vocabulary)))
+            poi_ids.append(len(names))
+        lat.append(round(poi.lat * E7))
+        lon.append(round(poi.lon * E7))
+        names.append(poi.name)
+        tags.append(json.dumps(poi.tags, ensure_ascii=False, separators=(",", ":")) if poi.tags else "")
+        category.append(categories.setdefault(poi.category, len(categories)))
+        if poi.hours is None:
+            hours.append(0)
+        else:
+            key = json.dumps(poi.hours, sort_keys=True)
+            if key not in pattern_of:
+                pattern_of[key] = patterns.setdefault(week_mask(poi.hours), len(patterns))
+            hours.append(pattern_of[key])
+        price.append(math.nan if poi.price is None else poi.price)
+        availability.append(AVAILABILITY.index(poi.availability) if poi.availability in AVAILABILITY else 0)
+
+    n = len(names)
+    if not n:
+        raise ValueError("no POIs to write")
+    order = _str_order(np.frombuffer(lat, dtype=np.int32), np.frombuffer(lon, dtype=np.int32))
+    lat_s = np.frombuffer(lat, dtype=np.int32)[order]
+    lon_s = np.frombuffer(lon, dtype=np.int32)[order]
+    names = [names[i] for i in order]
+    tags = [tags[i] for i in order]
+    boxes, levels = _rtree(lat_s, lon_s)
+    position = np.empty(n, dtype=np.uint32)
+    position[order] = np.arange(n, dtype=np.uint32)
+    term_strings, term_postings = _inverted(vocabulary, np.frombuffer(term_ids, dtype=np.uint32),
+                                            position[np.frombuffer(poi_ids, dtype=np.uint32)])
+    mask_table = np.zeros((len(patterns), MASK_BYTES), dtype=np.uint8)
+    for mask, i in patterns.items():
+        if mask:
+            mask_table[i] = np.frombuffer(mask, dtype=np.uint8)
+
+    sections: dict[str, np.ndarray] = {
+        "lat": lat_s,
+        "lon": lon_s,
+        "category": np.frombuffer(category, dtype=np.uint16)[order],
+        "hours": np.frombuffer(hours, dtype=np.uint32)[order],
+        "price": np.frombuffer(price, dtype=np.float32)[order],
+        "availability": np.frombuffer(availability, dtype=np.uint8)[order],
+        "hour_masks": mask_table.ravel(),
+        "rtree_boxes": boxes.ravel(),
+        "rtree_levels": np.asarray(levels, dtype=np.uint64),
+    }
+    sections.update(_heap("name", names))
+    sections.update(_heap("tag", tags))
+    sections.update(_heap("cat", sorted(categories, key=categories.get)))
+    sections.update(_heap("term", term_strings))
+    sections["post_offsets"], sections["postings"] = term_postings
+    sections["gram_keys"], sections["gram_offsets"], sections["gram_terms"] = _trigrams(term_strings)
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, n, len(sections)))
+        table_at = f.tell()
+        f.write(b"\0" * SECTION.size * len(sections))
+        entries = []
+        for name, data in sections.items():
+            f.write(b"\0" * (-f.tell() % 8))
+            entries.append(SECTION.pack(name.encode(), data.dtype.str.encode(), f.tell(), data.size))
+            f.write(np.ascontiguousarray(data).tobytes())
+        f.seek(table_at)
+        f.write(b"".join(entries))
+    return n
+
+
+def _str_order(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """Sort-tile-recursive order: vertical slices by longitude, each sorted by latitude."""
+    n = len(lat)
+    leaves = max(1, -(-n // NODE_SIZE))
+    slice_size = NODE_SIZE * max(1, math.ceil(math.sqrt(leaves)))
+    by_lon = np.argsort(lon, kind="stable")
+    column = np.empty(n, dtype=np.int64)
+    column[by_lon] = np.arange(n) // slice_size
+    return np.lexsort((lat, column))
+
+
+def _rtree(lat: np.ndarray, lon: np.ndarray) -> tuple[np.ndarray, list[int]]:
+    """Packed R-tree boxes ``(min_lat, min_lon, max_lat, max_lon)``, leaves first, root last."""
+    boxes = []
+    lo_lat, lo_lon, hi_lat, hi_lon = lat, lon, lat, lon
+    while True:
+        groups = np.arange(0, len(lo_lat), NODE_SIZE)
+        level = np.stack([np.minimum.reduceat(lo_lat, groups), np.minimum.reduceat(lo_lon, groups),
+                          np.maximum.reduceat(hi_lat, groups), np.maximum.reduceat(hi_lon, groups)], axis=1)
+        boxes.append(level)
+        if len(level) <= 1:
+            break
+        lo_lat, lo_lon, hi_lat, hi_lon = level.T
+    levels = [0]
+    for level in boxes:
+        levels.append(levels[-1] + len(level))
+    return np.concatenate(boxes).astype(np.int32), levels
+
+
+def _words(poi: Poi) -> set[str]:
+    words = set(tokens(poi.name))
+    for key in INDEXED_TAGS:
+        value = poi.tags.get(key)
+        if value:
+            words.add(f"{key}={value.lower()}")
+            words.update(tokens(value))
+    return words
+
+
+def _inverted(vocabulary: dict[str, int], terms: np.ndarray, pois: np.ndarray) -> tuple[list[str], tuple[np.ndarray, np.ndarray]]:
+    """Sorted vocabulary, posting offsets and postings (POI ids ascending within a term)."""
+    strings = sorted(vocabulary)
+    rank = np.empty(len(vocabulary), dtype=np.uint32)
+    rank[[vocabulary[s] for s in strings]] = np.arange(len(strings), dtype=np.uint32)
+    terms = rank[terms]
+    order = np.lexsort((pois, terms))
+    offsets = np.zeros(len(strings) + 1, dtype=np.uint64)
+    np.cumsum(np.bincount(terms, minlength=len(strings)), out=offsets[1:])
+    return strings, (offsets, pois[order])
+
+
+def _grams(word: str) -> set[int]:
+    padded = f"^{word}$"
+    return {zlib.crc32(padded[i:i + 3].encode()) for i in range(len(padded) - 2)}
+
+
+def _trigrams(terms: list[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    keys, ids = array("I"), array("I")
+    for t, term in enumerate(terms):
+        if "=" in term:
+            continue
+        for gram in _grams(term):
+            keys.append(gram)
+            ids.append(t)
+    keys_np, ids_np = np.frombuffer(keys, dtype=np.uint32), np.frombuffer(ids, dtype=np.uint32)
+    order = np.argsort(keys_np, kind="stable")
+    unique, counts = np.unique(keys_np[order], return_counts=True)
+    offsets = np.zeros(len(unique) + 1, dtype=np.uint64)
+    np.cumsum(counts, out=offsets[1:])
+    return unique.astype(np.uint32), offsets, ids_np[order]
+
+
+def _heap(prefix: str, strings: list[str]) -> dict[str, np.ndarray]:
+    encoded = [s.encode() for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return {f"{prefix}_offsets": offsets, f"{prefix}_bytes": np.frombuffer(b"".join(encoded), dtype=np.uint8)}
+
+
+# --------------------------------------------------------------------------- queries
+
+
+class _Strings:
+    """Read-only string table backed by offsets and bytes sections (works with bisect)."""
+
+    def __init__(self, offsets: np.ndarray, data: np.ndarray) -> None:
+        self.offsets, self.data = offsets, data
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return self.data[int(self.offsets[i]):int(self.offsets[i + 1])].tobytes().decode()
+
+
+class PoiCatalogue:
+    """Read-only, memory-mapped POI catalogue."""
+
+    FUZZY_CANDIDATES = 200
+    DIRECT_SCAN = 4096  # text matches below this are ranked directly instead of walking the tree
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n, count = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a POI catalogue")
+        self.size = n
+        s: dict[str, np.ndarray] = {}
+        for k in range(count):
+            name, dtype, offset, length = SECTION.unpack_from(self._mmap, HEADER.size + k * SECTION.size)
+            s[name.rstrip(b"\0").decode()] = np.frombuffer(self._mmap, dtype=dtype.rstrip(b"\0").decode(), count=length, offset=offset)
+        self._s = s
+        self.lat, self.lon = s["lat"], s["lon"]
+        self.category, self.hours = s["category"], s["hours"]
+        self.price, self.availability = s["price"], s["availability"]
+        self.masks = s["hour_masks"].reshape(-1, MASK_BYTES)
+        self.boxes = s["rtree_boxes"].reshape(-1, 4)
+        self.levels = s["rtree_levels"].astype(np.int64)
+        self.names = _Strings(s["name_offsets"], s["name_bytes"])
+        self.tags = _Strings(s["tag_offsets"], s["tag_bytes"])
+        self.categories = [_Strings(s["cat_offsets"], s["cat_bytes"])[i] for i in range(len(s["cat_offsets"]) - 1)]
+        self.terms = _Strings(s["term_offsets"], s["term_bytes"])
+
+    def close(self) -> None:
+        self.__dict__.update(_s=None, lat=None, lon=None, category=None, hours=None, price=None, availability=None,
+                             masks=None, boxes=None, names=None, tags=None, terms=None)
+        self._mmap.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, i: int) -> Poi:
+        tags = self.tags[i]
+        price = float(self.price[i])
+        return Poi(
+            self.names[i], int(self.lat[i]) / E7, int(self.lon[i]) / E7, self.categories[self.category[i]],
+            json.loads(tags) if tags else {},
+            mask_hours(self.masks[self.hours[i]].tobytes()) if self.hours[i] else None,
+            None if math.isnan(price) else price,
+            AVAILABILITY[self.availability[i]] or None,
+        )
+
+    # -- spatial
+
+    def bbox(self, south: float, west: float, north: float, east: float) -> np.ndarray:
+        """Ids of POIs inside the box, in storage order."""
+        s, w, n, e = (round(v * E7) for v in (south, west, north, east))
+        top = len(self.levels) - 2
+        nodes = np.arange(self.levels[top + 1] - self.levels[top])
+        for level in range(top, -1, -1):
+            box = self.boxes[self.levels[level] + nodes]
+            nodes = nodes[(box[:, 0] <= n) & (box[:, 2] >= s) & (box[:, 1] <= e) & (box[:, 3] >= w)]
+            limit = self.size if level == 0 else self.levels[level] - self.levels[level - 1]
+            nodes = (nodes[:, None] * NODE_SIZE + np.arange(NODE_SIZE)).ravel()
+            nodes = nodes[nodes < limit]
+        lat, lon = self.lat[nodes], self.lon[nodes]
+        return nodes[(lat >= s) & (lat <= n) & (lon >= w) & (lon <= e)]
+
+    def within(self, point: Point, radius_m: float, where: Callable[[np.ndarray], np.ndarray] | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Ids and distances (m) of POIs within ``radius_m``, nearest first."""
+        dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+        dlon = dlat / max(math.cos(math.radians(point[0])), 1e-6)
+        ids = self.bbox(point[0] - dlat, point[1] - dlon, point[0] + dlat, point[1] + dlon)
+        if where is not None:
+            ids = ids[where(ids)]
+        dist = _haversine(point, self.lat[ids] / E7, self.lon[ids] / E7)
+        inside = dist <= radius_m
+        order = np.argsort(dist[inside], kind="stable")
+        return ids[inside][order], dist[inside][order]
+
+    def nearest(self, point: Point, k: int, where: Callable[[np.ndarray], np.ndarray] | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """The ``k`` nearest POIs passing ``where`` (best-first over the R-tree)."""
+        top = len(self.levels) - 2
+        heap: list[tuple[float, int, int]] = []  # (distance, level or -1 for a POI, index)
+        roots = np.arange(self.levels[top + 1] - self.levels[top])
+        for d, i in zip(self._box_distance(point, self.levels[top] + roots).tolist(), roots.tolist()):
+            heapq.heappush(heap, (d, top, i))
+        ids, dists = [], []
+        while heap and len(ids) < k:
+            d, level, i = heapq.heappop(heap)
+            if level < 0:
+                ids.append(i)
+                dists.append(d)
+                continue
+            children = np.arange(i * NODE_SIZE, (i + 1) * NODE_SIZE)
+            if level == 0:
+                children = children[children < self.size]
+                if where is not None:
+                    children = children[where(children)]
+                child_d, child_level = _haversine(point, self.lat[children] / E7, self.lon[children] / E7), -1
+            else:
+                children = children[children < self.levels[level] - self.levels[level - 1]]
+                child_d, child_level = self._box_distance(point, self.levels[level - 1] + children), level - 1
+            for cd, c in zip(child_d.tolist(), children.tolist()):
+                heapq.heappush(heap, (cd, child_level, c))
+        return np.asarray(ids, dtype=np.int64), np.asarray(dists)
+
+    def _box_distance(self, point: Point, rows: np.ndarray) -> np.ndarray:
+        box = self.boxes[rows] / E7
+        lat = np.clip(point[0], box[:, 0], box[:, 2])
+        lon = np.clip(point[1], box[:, 1], box[:, 3])
+        return _haversine(point, lat, lon)
+
+    # -- text
+
+    def search(self, text: str, fuzzy: bool = True) -> np.ndarray:
+        """Sorted ids of POIs matching every word of ``text`` (``key=value`` tag terms allowed)."""
+        result = None
+        for word in text.lower().split() if "=" in text else tokens(text):
+            matches = self._postings(self._term_ids(word, fuzzy))
+            result = matches if result is None else np.intersect1d(result, matches, assume_unique=True)
+            if not len(result):
+                break
+        return np.zeros(0, dtype=np.uint32) if result is None else result
+
+    def _term_ids(self, word: str, fuzzy: bool) -> list[int]:
+        i = bisect.bisect_left(self.terms, word)
+        exact = [i] if i < len(self.terms) and self.terms[i] == word else []
+        edits = 0 if len(word) <= 3 else 1 if len(word) <= 7 else 2
+        if not fuzzy or not edits or "=" in word:
+            return exact
+        s = self._s
+        keys = s["gram_keys"]
+        grams = sorted(_grams(word))
+        found = []
+        for g in grams:
+            j = np.searchsorted(keys, g)
+            if j < len(keys) and keys[j] == g:
+                found.append(s["gram_terms"][int(s["gram_offsets"][j]):int(s["gram_offsets"][j + 1])])
+        if not found:
+            return exact
+        candidates, shared = np.unique(np.concatenate(found), return_counts=True)
+        # q-gram lemma: each edit destroys at most three trigrams
+        close = shared >= len(grams) - 3 * edits
+        candidates = candidates[close][np.argsort(-shared[close], kind="stable")][: self.FUZZY_CANDIDATES]
+        return sorted(set(exact) | {int(t) for t in candidates if _within_edits(word, self.terms[int(t)], edits)})
+
+    def _postings(self, term_ids: list[int]) -> np.ndarray:
+        offsets, postings = self._s["post_offsets"], self._s["postings"]
+        parts = [postings[int(offsets[t]):int(offsets[t + 1])] for t in term_ids]
+        if not parts:
+            return np.zeros(0, dtype=np.uint32)
+        # a copy even for one term: results must not keep the mapping exported, or close() fails
+        return np.array(parts[0]) if len(parts) == 1 else np.unique(np.concatenate(parts))
+
+    # -- attributes
+
+    def categories_matching(self, category: str) -> np.ndarray:
+        """Category numbers for ``tourism=museum`` or just ``museum``."""
+        return np.asarray([i for i, c in enumerate(self.categories)
+                           if c == category or ("=" not in category and c.split("=", 1)[1] == category)], dtype=np.uint16)
+
+    def open_at(self, ids: np.ndarray, when: datetime.datetime, unknown: bool = False) -> np.ndarray:
+        """Boolean mask over ``ids``: open at ``when`` (local time); ``unknown`` for POIs without hours."""
+        slot = week_slot(when) % WEEK_SLOTS
+        pattern = self.hours[ids]
+        is_open = (self.masks[pattern, slot >> 3] >> (slot & 7)) & 1 == 1
+        return np.where(pattern == 0, unknown, is_open)
+
+    def find(self, point: Point, radius_m: float | None = None, k: int | None = None, category: str | None = None,
+             text: str | None = None, when: datetime.datetime | None = None, unknown_hours: bool = False) -> list[tuple[int, float]]:
+        """"What is near ``point``, open at ``when``, in ``category``, matching ``text``": ``(id, metres)`` nearest first."""
+        categories = self.categories_matching(category) if category else None
+        matches = self.search(text) if text else None
+        if matches is not None and not len(matches):
+            return []
+
+        def where(ids: np.ndarray) -> np.ndarray:
+            keep = np.ones(len(ids), dtype=bool)
+            if categories is not None:
+                keep &= np.isin(self.category[ids], categories)
+            if matches is not None:
+                j = np.minimum(np.searchsorted(matches, ids), len(matches) - 1)
+                keep &= matches[j] == ids
+            if when is not None:
+                keep &= self.open_at(ids, when, unknown_hours)
+            return keep
+
+        if matches is not None and len(matches) <= self.DIRECT_SCAN:
+            ids = matches[where(matches)].astype(np.int64)
+            dist = _haversine(point, self.lat[ids] / E7, self.lon[ids] / E7)
+            order = np.argsort(dist, kind="stable")
+            ids, dist = ids[order], dist[order]
+            if radius_m is not None:
+                ids, dist = ids[dist <= radius_m], dist[dist <= radius_m]
+        elif radius_m is not None:
+            ids, dist = self.within(point, radius_m, where)
+        else:
+            ids, dist = self.nearest(point, k or 10, where)
+        if k is not None:
+            ids, dist = ids[:k], dist[:k]
+        return list(zip(ids.tolist(), dist.tolist()))
+
+
+def _haversine(point: Point, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    p1, p2 = math.radians(point[0]), np.radians(lat)
+    dphi, dl = p2 - p1, np.radians(lon - point[1])
+    h = np.sin(dphi / 2) ** 2 + math.cos(p1) * np.cos(p2) * np.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
+
+
+def _within_edits(a: str, b: str, limit: int) -> bool:
+    """Levenshtein distance of at most ``limit`` (banded)."""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [limit + 1] * len(b)
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != b[j - 1]))
+        if min(current) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+
+# --------------------------------------------------------------------------- cli
+
+
+def _point(text: str) -> Point:
+    lat, lon = text.split(",")
+    return float(lat), float(lon)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="build a catalogue from an OSM extract")
+    build.add_argument("extract")
+    build.add_argument("catalogue")
+    build.add_argument("--scraped", help="scrape.py result store to merge")
+    query = sub.add_parser("query", help="POIs near a point")
+    query.add_argument("catalogue")
+    query.add_argument("point", type=_point)
+    query.add_argument("--radius", type=float, help="metres")
+    query.add_argument("-k", type=int, default=10)
+    query.add_argument("--category")
+    query.add_argument("--text")
+    query.add_argument("--open-at", type=datetime.datetime.fromisoformat)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        n = build_catalogue(pois_from_osm(args.extract, args.scraped), args.catalogue)
+        print(f"{n} POIs", file=sys.stderr)
+    else:
+        catalogue = PoiCatalogue(args.catalogue)
+        for i, metres in catalogue.find(args.point, args.radius, args.k, args.category, args.text, args.open_at):
+            print(json.dumps({**catalogue[i].to_json(), "distance_m": round(metres)}, ensure_ascii=False))
+        catalogue.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""Incremental re-planning: repair the rest of a trip after an edit instead of solving it again.
+
+A ``Replanner`` solves the trip once, then keeps the travel-time matrix, the
+solver's routes and the validator between edits.  An edit moves the clock
+(freezing what has been visited), removes, pins or closes a stop; the repair
+drops stops that no longer fit today's or later days' schedules, re-inserts
+what it can and runs a short local search over the remaining days only.
+Only days whose schedule changed are re-validated.
+
+Edits are JSON objects, one per line in a session file::
+
+    {"op": "now", "day": 2, "time": "13:10", "lat": 41.40, "lon": 2.17}  # plan followed until now; lat/lon optional
+    {"op": "delay", "minutes": 45}                                        # stuck where we are (late train)
+    {"op": "remove", "stop": "Sagrada Familia"}                           # skip it, never re-add
+    {"op": "pin", "stop": "Park Guell"}                                   # must stay in the plan
+    {"op": "close", "stop": "Picasso Museum", "day": 3, "from": "14:00"}  # day defaults to today, no "from": all day
+
+    python scripts/replan.py problem.json session.jsonl [--index data/city.ch] > itinerary.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sys
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from opening_hours import hhmm
+from routing import Point
+from solver import UNREACHABLE_MIN, Problem, Route, Solver
+from validator import DEFAULT_SPEED_KMH, DETOUR_FACTOR, Issue, Validator, minutes
+
+REPAIR_BUDGET_S = 0.3
+POSITION = "current position"
+
+
+@dataclass
+class Outcome:
+    seconds: float
+    changed_days: list[int]
+    dropped: list[str] = field(default_factory=list)  # planned stops the repair had to give up
+    issues: list[Issue] = field(default_factory=list)
+
+
+class Replanner:
+    """Plan once, then repair the remaining trip after each edit."""
+
+    def __init__(self, problem: dict, index=None, cache=None, time_limit_s: float = 3.0, repair_s: float = REPAIR_BUDGET_S) -> None:
+        self.problem = problem
+        self.index = index
+        self.time_limit_s = time_limit_s
+        self.repair_s = repair_s
+        self.p = self._with_position(Problem.from_json(problem, index=index, cache=cache))
+        self.position_node = len(self.p.names) - 1
+        self.node = {self.p.names[v]: v for v in self.p.pois}
+        self.solver = Solver(self.p, time_limit_s).solve()
+        self.itinerary = self.solver.itinerary()
+        self.validator = Validator(self.itinerary)
+        self.day, self.minute = 0, float(self.p.day_start[0])
+        self.done: dict[int, list[int]] = {}  # visited prefix of a day, by node
+        self.removed: set[int] = set()
+        self.closures: dict[tuple[int, int], float | None] = {}  # (day, node) -> closing minute, None: all day
+        self._touched: set[int] = set()  # days an edit changed directly
+
+    def _with_position(self, p: Problem) -> Problem:
+        """Reserve one extra node for the traveller's live position; it has no window so is never visited."""
+        p.travel = np.pad(p.travel, ((0, 1), (0, 1)), constant_values=UNREACHABLE_MIN)
+        p.duration = np.append(p.duration, 0.0)
+        p.priority = np.append(p.priority, 0.0)
+        p.open = np.pad(p.open, ((0, 0), (0, 1)), constant_values=np.inf)
+        p.close = np.pad(p.close, ((0, 0), (0, 1)), constant_values=-np.inf)
+        p.names = [*p.names, POSITION]
+        return p
+
+    # -- edits
+
+    def apply(self, edit: dict, full: bool = False) -> Outcome:
+        """Apply one edit and repair the plan; ``full`` solves the remaining days from scratch instead."""
+        start = time.perf_counter()
+        before = {r.day: (list(r.nodes), None if r.start is None else r.start.copy()) for r in self.solver.routes[self.day:]}
+        op = edit["op"]
+        if op == "now":
+            position = (edit["lat"], edit["lon"]) if "lat" in edit else None
+            self._advance(edit["day"], minutes(edit["time"]), position)
+        elif op == "delay":
+            self.minute += edit["minutes"]
+            self.p.day_start[self.day] = max(self.p.day_start[self.day], self.minute)
+        elif op == "remove":
+            v = self._node(edit["stop"])
+            self.removed.add(v)
+            self.solver.pinned.discard(v)
+            self.solver.unassigned.discard(v)
+            for r in self.solver.active:
+                if v in r.nodes:
+                    r.nodes.remove(v)
+                    self.solver._refresh(r)
+                    self._touched.add(r.day)
+        elif op == "pin":
+            v = self._node(edit["stop"])
+            self.removed.discard(v)
+            self.solver.pinned.add(v)
+        elif op == "close":
+            v, d = self._node(edit["stop"]), edit.get("day", self.day)
+            closes = float(minutes(edit["from"])) if "from" in edit else None
+            self.closures[(d, v)] = closes
+            self._close(d, v, closes)
+            self._touched.add(d)
+        else:
+            raise ValueError(f"unknown edit {op!r}")
+        changed, dropped = self._resolve() if full else self._repair(before)
+        return Outcome(time.perf_counter() - start, changed, [self.p.names[v] for v in dropped], self.validator.issues)
+
+    def _node(self, name: str) -> int:
+        if name not in self.node:
+            raise ValueError(f"no POI named {name!r}")
+        return self.node[name]
+
+    def _close(self, day: int, v: int, closes: float | None) -> None:
+        if closes is None:
+            self.p.open[day, v], self.p.close[day, v] = np.inf, -np.inf
+        else:
+            self.p.close[day, v] = min(self.p.close[day, v], closes)
+
+    def _advance(self, day: int, minute: float, position: Point | None) -> None:
+        """Move the clock, assuming the plan was followed: stops started before now are visited."""
+        if (day, minute) < (self.day, self.minute):
+            raise ValueError("re-planning cannot go back in time")
+        p, route = self.p, self.solver.routes[day]
+        k = int(np.searchsorted(route.start, minute, side="left")) if len(route.nodes) else 0
+        visited, route.nodes = route.nodes[:k], route.nodes[k:]
+        if visited:
+            self.done[day] = self.done.get(day, []) + visited
+            last = visited[-1]
+            p.origin[day] = last
+            p.day_start[day] = max(minute, route.start[k - 1] + p.duration[last])
+        else:
+            p.day_start[day] = max(minute, p.day_start[day])
+        if position is not None:
+            p.travel[self.position_node] = self._travel_from(position)
+            p.origin[day] = self.position_node
+        self.day, self.minute = day, minute
+        self.solver.active = self.solver.routes[day:]
+        self.solver._refresh(route)
+
+    def _travel_from(self, point: Point) -> np.ndarray:
+        """Travel minutes from ``point`` to every node (the position row of the matrix)."""
+        coords: list[Point] = [None] * self.p.n_hotels
+        for d, day in enumerate(self.problem["days"]):
+            coords[self.p.hotel[d]] = (day["hotel"]["lat"], day["hotel"]["lon"])
+        coords += [(poi["lat"], poi["lon"]) for poi in self.problem["pois"]]
+        if self.index is not None:
+            legs = self.index.one_to_many(point, coords)
+            row = np.array([UNREACHABLE_MIN if leg is None else leg.duration_s / 60 for leg in legs])
+        else:
+            lat, lon = np.radians(np.asarray(coords)).T
+            lat0, lon0 = math.radians(point[0]), math.radians(point[1])
+            h = np.sin((lat - lat0) / 2) ** 2 + math.cos(lat0) * np.cos(lat) * np.sin((lon - lon0) / 2) ** 2
+            row = 12_742_000 * np.arcsin(np.sqrt(h)) * DETOUR_FACTOR / (DEFAULT_SPEED_KMH * 1000 / 60)
+        return np.append(np.ceil(row), UNREACHABLE_MIN)
+
+    # -- repair
+
+    def _repair(self, before: dict[int, tuple[list[int], np.ndarray | None]]) -> tuple[list[int], list[int]]:
+        """Fix broken days, re-insert dropped and pinned stops, then local search over the touched days only.
+
+        ``before`` holds each remaining day's nodes and start times from before the edit was applied, so
+        schedules the edit itself shifted (moving the clock, say) are re-validated too.
+        """
+        solver, future = self.solver, self.solver.routes[self.day:]
+        touched, self._touched = self._touched | {self.day}, set()
+        dropped = []
+        for r in future:
+            lost = self._make_feasible(r)
+            if lost:
+                touched.add(r.day)
+                dropped += lost
+        planned = self._planned()
+        retry = [v for v in dropped if v not in self.removed] + sorted(solver.pinned - planned)
+        for v in sorted(retry, key=lambda v: -self.p.priority[v]):
+            _, route, k = solver.best_insertion(v)
+            if route is not None:
+                solver.insert(route, v, k)
+                touched.add(route.day)
+            elif v in solver.pinned:
+                route, out = self._swap_in(v, future)
+                if route is not None:
+                    touched.add(route.day)
+                    dropped += out
+        solver.active = [r for r in future if r.day in touched]
+        solver.improve(time.perf_counter() + self.repair_s)
+        solver.active = future
+        changed = [r.day for r in future
+                   if r.nodes != before[r.day][0] or before[r.day][1] is None or not np.array_equal(r.start, before[r.day][1])]
+        for d in changed:
+            self.validator.set_stops(d, self._stops(d))
+        self._unvisited()
+        planned = self._planned()
+        return changed, sorted({v for v in dropped if v not in planned})
+
+    def _resolve(self) -> tuple[list[int], list[int]]:
+        """Baseline: new matrix and a from-scratch solve of today's remainder and later days."""
+        planned = self._planned()
+        p = Problem.from_json(self.problem, index=self.index)
+        p = self._with_position(p)
+        p.travel[self.position_node] = self.p.travel[self.position_node]
+        p.origin, p.day_start = self.p.origin, self.p.day_start
+        for (d, v), closes in self.closures.items():
+            p.open[d, v], p.close[d, v] = self.p.open[d, v], self.p.close[d, v]
+        old = self.solver
+        solver = Solver(p, self.time_limit_s)
+        solver.routes[:self.day] = old.routes[:self.day]
+        solver.active = solver.routes[self.day:]
+        solver.pinned = set(old.pinned)
+        solver.unassigned = set(p.pois) - self.removed - {v for r in solver.routes[:self.day] for v in r.nodes} \
+            - {v for nodes in self.done.values() for v in nodes}
+        deadline = time.perf_counter() + self.time_limit_s
+        for v in sorted(solver.pinned & solver.unassigned, key=lambda v: -p.priority[v]):
+            _, route, k = solver.best_insertion(v)
+            if route is not None:
+                solver.insert(route, v, k)
+        solver.construct()
+        solver.improve(deadline)
+        self.p, self.solver = p, solver
+        for d in range(self.day, len(solver.routes)):
+            self.itinerary["days"][d]["stops"] = self._stops(d)
+        self.validator = Validator(self.itinerary)
+        self._unvisited()
+        return list(range(self.day, len(solver.routes))), sorted(planned - self._planned())
+
+    def _make_feasible(self, route: Route) -> list[int]:
+        """Drop stops until the day's schedule works again: lowest priority before the first broken stop."""
+        dropped = []
+        while True:
+            k = self._violation(route.day, route.nodes)
+            if k is None:
+                break
+            candidates = route.nodes[:k + 1]
+            free = [v for v in candidates if v not in self.solver.pinned] or candidates
+            v = min(free, key=lambda v: (self.p.priority[v], -self.p.duration[v]))
+            route.nodes.remove(v)
+            dropped.append(v)
+            if v not in self.removed:
+                self.solver.unassigned.add(v)
+        self.solver._refresh(route)
+        return dropped
+
+    def _swap_in(self, v: int, routes: list[Route]) -> tuple[Route | None, list[int]]:
+        """Make room for pinned ``v``: per day, take out lowest-priority unpinned stops until it fits; cheapest day wins."""
+        solver, p = self.solver, self.p
+        best: tuple[float, Route | None, list[int], list[int], int] = (np.inf, None, [], [], -1)
+        for r in routes:
+            nodes, out, lost = list(r.nodes), [], 0.0
+            for u in sorted((u for u in r.nodes if u not in solver.pinned), key=lambda u: p.priority[u]):
+                if lost + p.priority[u] >= best[0]:
+                    break
+                nodes.remove(u)
+                out.append(u)
+                lost += p.priority[u]
+                trial = Route(r.day, nodes)
+                solver._refresh(trial)
+                if trial.start is None:
+                    continue
+                _, k = solver.insertion(trial, v)
+                if k >= 0:
+                    best = (lost, r, list(nodes), list(out), k)
+                    break
+        _, route, nodes, out, k = best
+        if route is not None:
+            route.nodes = nodes
+            solver.unassigned.update(out)
+            solver.insert(route, v, k)
+        return route, out
+
+    def _violation(self, day: int, nodes: list[int]) -> int | None:
+        """Position of the first stop that breaks its window (the last one if the day overruns)."""
+        p = self.p
+        t, prev = p.day_start[day], p.origin[day]
+        for k, v in enumerate(nodes):
+            t = max(t + p.travel[prev, v], p.open[day, v])
+            if t + p.duration[v] > p.close[day, v]:
+                return k
+            t += p.duration[v]
+            prev = v
+        if t + p.travel[prev, p.hotel[day]] > p.day_end[day]:
+            return len(nodes) - 1
+        return None
+
+    # -- output
+
+    def _planned(self) -> set[int]:
+        return {v for r in self.solver.routes for v in r.nodes} | {v for nodes in self.done.values() for v in nodes}
+
+    def _stops(self, day: int) -> list[dict]:
+        """Visited stops as previously written, then the repaired remainder with closures applied."""
+        visited = self.itinerary["days"][day]["stops"][:len(self.done.get(day, []))]
+        route = self.solver.routes[day]
+        stops = self.solver.day_stops(route)
+        for v, stop in zip(route.nodes, stops):
+            if (day, v) in self.closures and "opening_hours" in stop:
+                closes = self.closures[(day, v)]
+                stop["opening_hours"] = [] if closes is None else [
+                    [o, hhmm(min(minutes(c), closes))] for o, c in stop["opening_hours"] if minutes(o) < closes]
+        return visited + stops
+
+    def _unvisited(self) -> None:
+        names = self.p.names
+        self.itinerary["unvisited"] = [names[v] for v in sorted(set(self.p.pois) - self._planned())]
+
+    def score(self) -> float:
+        """Total priority of visited and planned stops."""
+        return float(self.p.priority[sorted(self._planned())].sum())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("problem", help="problem JSON file")
+    parser.add_argument("session", help="JSONL file of edits")
+    parser.add_argument("--index", help="routing index for real travel times (default: distance estimate)")
+    parser.add_argument("--time-limit", type=float, default=3.0, help="budget for the initial solve in seconds")
+    parser.add_argument("--repair-budget", type=float, default=REPAIR_BUDGET_S, help="local search budget per edit")
+    args = parser.parse_args()
+    with open(args.problem) as f:
+        problem = json.load(f)
+    index = None
+    if args.index:
+        from routing import RoutingIndex
+
+        index = RoutingIndex(args.index)
+    planner = Replanner(problem, index, time_limit_s=args.time_limit, repair_s=args.repair_budget)
+    with open(args.session) as f:
+        for line in f:
+            if line.strip():
+                edit = json.loads(line)
+                outcome = planner.apply(edit)
+                print(f"{edit['op']:>6}: {outcome.seconds * 1e3:.0f} ms, days {outcome.changed_days}, "
+                      f"dropped {outcome.dropped}, {len(outcome.issues)} issues", file=sys.stderr)
+    json.dump(planner.itinerary, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Offline stand-in for an upstream MCP server, replaying recorded tool calls.
+
+    python scripts/replay_server.py fixtures/jinko_recording.jsonl --delay 0.5
+
+The recording is JSONL of ``{"tool", "arguments", "result"}`` lines, as
+written by ``jinko_proxy.py --record``.  Calls are matched on normalised
+arguments; unknown calls return an MCP error result.  ``--delay`` simulates
+upstream latency so caching and coalescing can be measured without network.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+
+from jinko_proxy import cache_key
+from mcp_stdio import Server, text_result
+
+
+class ReplayServer(Server):
+    def __init__(self, recording: str, delay_s: float = 0.0) -> None:
+        super().__init__("replay")
+        self.delay_s = delay_s
+        self.responses: dict[str, dict] = {}
+        self.tool_names: list[str] = []
+        with open(recording) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                call = json.loads(line)
+                self.responses[cache_key(call["tool"], call["arguments"])] = call["result"]
+                if call["tool"] not in self.tool_names:
+                    self.tool_names.append(call["tool"])
+        self.calls = 0
+
+    async def list_tools(self) -> list[dict]:
+        return [
+            {"name": name, "description": f"recorded {name}", "inputSchema": {"type": "object"}}
+            for name in self.tool_names
+        ]
+
+    async def call_tool(self, name: str, arguments: dict) -> dict:
+        self.calls += 1
+        await asyncio.sleep(self.delay_s)
+        result = self.responses.get(cache_key(name, arguments))
+        if result is None:
+            return text_result(f"no recorded response for {name} {json.dumps(arguments)}", is_error=True)
+        return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recording", help="JSONL of recorded tool calls")
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds added to every call")
+    args = parser.parse_args()
+    ReplayServer(args.recording, args.delay).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""Trip reports: map timeline with route animation, Gantt chart, animation frames.
+
+Reads a validator-format itinerary and streams, one day at a time:
+
+* ``report.html`` - an iframe-embeddable Leaflet map with a time slider and
+  play button; the traveller's position is interpolated in the browser, so
+  no frames are stored.  Route geometry is simplified for several zoom
+  levels and packed as delta + varint encoded integer arrays.
+* ``gantt.md`` - a Mermaid Gantt chart of every day.
+* ``frames.jsonl`` (optional) - position every ``--frame-step`` minutes,
+  generated lazily for external animation tools.
+
+    python scripts/report.py itinerary.json --out report/ [--index data/city.ch] [--frames]
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import datetime
+import html
+import json
+import math
+import os
+from array import array
+from dataclasses import dataclass
+from typing import IO, Iterable, Iterator
+
+import numpy as np
+
+from routing import Point, haversine_m
+from validator import DEFAULT_SPEED_KMH, DETOUR_FACTOR, minutes
+
+# Map zoom level -> simplification tolerance of about one screen pixel there.
+ZOOM_LEVELS = (6, 9, 12, 15)
+QUANTUM = 1e5  # coordinates are stored in 1e-5 degree (~1 m) steps
+
+
+@dataclass
+class LegPath:
+    depart: int  # minutes since trip start
+    arrive: int
+    points: list[Point]
+
+
+@dataclass
+class DayPlan:
+    index: int
+    date: datetime.date
+    stops: list[dict]
+    legs: list[LegPath]
+
+
+def trip_days(itinerary: dict, index=None) -> Iterator[DayPlan]:
+    """Days with the travel path between consecutive places (hotel, stops, hotel)."""
+    first = _date(itinerary["days"][0], None)
+    hotel_prev = None
+    for d, day in enumerate(itinerary["days"]):
+        date = _date(day, first + datetime.timedelta(d))
+        base = d * 1440
+        stops = [s for s in day.get("stops", []) if "lat" in s and "lon" in s]
+        hotel = day.get("hotel") if day.get("hotel") and "lat" in day["hotel"] else None
+        legs = []
+        if stops:
+            # the morning leg leaves the hotel just in time, the evening leg right after the last stop
+            if hotel_prev is not None:
+                first_stop = stops[0]
+                arrive = minutes(first_stop["start"])
+                depart = arrive - _travel_min(hotel_prev, first_stop)
+                legs.append(LegPath(base + depart, base + arrive, _path(index, hotel_prev, first_stop)))
+            for a, b in zip(stops, stops[1:]):
+                depart, start = minutes(a["end"]), minutes(b["start"])
+                arrive = min(start, depart + _travel_min(a, b))
+                legs.append(LegPath(base + depart, base + max(arrive, depart), _path(index, a, b)))
+            if hotel is not None:
+                depart = minutes(stops[-1]["end"])
+                legs.append(LegPath(base + depart, base + depart + _travel_min(stops[-1], hotel), _path(index, stops[-1], hotel)))
+        yield DayPlan(d, date, stops, legs)
+        hotel_prev = hotel
+
+
+def _travel_min(a: dict, b: dict) -> int:
+    """The itinerary's own leg duration into ``b``, else the validator's straight-line estimate."""
+    leg = b.get("leg") if "start" in b else None
+    if leg and "duration_min" in leg:
+        return int(leg["duration_min"])
+    metres = haversine_m((a["lat"], a["lon"]), (b["lat"], b["lon"])) * DETOUR_FACTOR
+    return math.ceil(metres / 1000 / DEFAULT_SPEED_KMH * 60)
+
+
+def _date(day: dict, default: datetime.date | None) -> datetime.date:
+    if "date" in day:
+        return datetime.date.fromisoformat(day["date"])
+    return default or datetime.date(2000, 1, 1)
+
+
+def _path(index, a: dict, b: dict) -> list[Point]:
+    start, end = (a["lat"], a["lon"]), (b["lat"], b["lon"])
+    if index is not None:
+        _, points = index.route(start, end)
+        if points:
+            return [start, *points, end]
+    return [start, end]
+
+
+# --------------------------------------------------------------------------- geometry
+
+
+def simplify(points: list[Point], tolerance_deg: float) -> list[Point]:
+    """Douglas-Peucker (iterative, vectorised per split), keeping both end points."""
+    if len(points) < 3:
+        return list(points)
+    xy = np.asarray(points, dtype=float)
+    keep = np.zeros(len(xy), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(xy) - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j - i < 2:
+            continue
+        a, b = xy[i], xy[j]
+        seg = xy[i + 1 : j] - a
+        dy, dx = b - a
+        norm = math.hypot(dx, dy)
+        if norm:
+            d = np.abs(dy * seg[:, 1] - dx * seg[:, 0]) / norm
+        else:
+            d = np.hypot(seg[:, 0], seg[:, 1])
+        k = int(d.argmax())
+        if d[k] > tolerance_deg:
+            keep[i + 1 + k] = True
+            stack.append((i, i + 1 + k))
+            stack.append((i + 1 + k, j))
+    return [points[k] for k in np.flatnonzero(keep)]
+
+
+def pack(points: Iterable[Point]) -> str:
+    """Delta + zigzag varint encoding of quantised coordinates, base64 for embedding."""
+    coords = array("i")
+    for lat, lon in points:
+        coords.append(round(lat * QUANTUM))
+        coords.append(round(lon * QUANTUM))
+    out = bytearray()
+    prev = [0, 0]
+    for k, value in enumerate(coords):
+        delta = value - prev[k & 1]
+        prev[k & 1] = value
+        z = delta * 2 if delta >= 0 else -delta * 2 - 1
+        while z >= 0x80:
+            out.append((z & 0x7F) | 0x80)
+            z >>= 7
+        out.append(z)
+    return base64.b64encode(out).decode()
+
+
+def _tolerance(zoom: int) -> float:
+    return 360.0 / (256 * 2**zoom)
+
+
+def _day_payload(plan: DayPlan) -> dict:
+    levels = []
+    paths = [leg.points for leg in plan.legs]
+    for zoom in sorted(ZOOM_LEVELS, reverse=True):  # each level simplifies the finer one
+        paths = [simplify(path, _tolerance(zoom)) for path in paths]
+        offsets = [0]
+        for path in paths:
+            offsets.append(offsets[-1] + len(path))
+        levels.append({"z": zoom, "p": pack(p for path in paths for p in path), "o": offsets})
+    levels.reverse()
+    return {
+        "d": plan.index,
+        "date": plan.date.isoformat(),
+        "s": [[s.get("name", ""), plan.index * 1440 + minutes(s["start"]), plan.index * 1440 + minutes(s["end"]),
+               round(s["lat"], 5), round(s["lon"], 5)] for s in plan.stops],
+        "l": [[leg.depart, leg.arrive] for leg in plan.legs],
+        "g": levels,
+    }
+
+
+# --------------------------------------------------------------------------- writers
+
+
+HTML_HEAD = """<!doctype html>
+<html><head><meta charset="utf-8"><meta name="viewport" content="width=device-width,initial-scale=1">
+<title>{title}</title>
+<link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css">
+<script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
+<style>
+html,body{{margin:0;height:100%;font:13px system-ui,sans-serif}}
+#map{{position:absolute;top:0;bottom:56px;left:0;right:0}}
+#bar{{position:absolute;bottom:0;left:0;right:0;height:56px;display:flex;align-items:center;gap:8px;padding:0 10px;box-sizing:border-box}}
+#t{{flex:1}}#label{{min-width:260px}}
+</style></head><body>
+<div id="map"></div>
+<div id="bar"><button id="play">&#9654;</button><input id="t" type="range" min="0" step="1"><span id="label"></span></div>
+<script>const DAYS=[];function day(d){{DAYS.push(d)}}</script>
+"""
+
+HTML_TAIL = """<script>
+(function(){
+const map=L.map('map'),colors=['#e6194b','#3cb44b','#4363d8','#f58231','#911eb4','#42d4f4','#f032e6','#469990'];
+L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png',{maxZoom:19,attribution:'&copy; OpenStreetMap contributors'}).addTo(map);
+function unpack(b64){const s=atob(b64),n=s.length,out=new Float64Array(n),acc=[0,0];let i=0,k=0;
+  while(i<n){let z=0,m=1,c;do{c=s.charCodeAt(i++);z+=(c&127)*m;m*=128}while(c&128);
+    const j=k&1;acc[j]+=z%2?-(z+1)/2:z/2;out[k++]=acc[j]/1e5}return out.subarray(0,k)}
+function plain(text){const e=document.createElement('span');e.textContent=text;return e}  // names are untrusted: never innerHTML
+const cache=new Map();
+function level(d,zoom){let g=d.g[0];for(const c of d.g)if(c.z<=zoom)g=c;
+  const key=d.d+':'+g.z;if(!cache.has(key))cache.set(key,{xy:unpack(g.p),o:g.o});return cache.get(key)}
+const lines=L.layerGroup().addTo(map),bounds=L.latLngBounds([]);
+for(const d of DAYS)for(const s of d.s){bounds.extend([s[3],s[4]]);
+  L.circleMarker([s[3],s[4]],{radius:5,color:colors[d.d%colors.length]}).bindTooltip(plain(s[0]+' (day '+(d.d+1)+')')).addTo(map)}
+function draw(){lines.clearLayers();const z=map.getZoom(),view=map.getBounds().pad(0.5);
+  for(const d of DAYS){const g=level(d,z),pts=[];for(let i=0;i<g.xy.length;i+=2)pts.push([g.xy[i],g.xy[i+1]]);
+    if(pts.length&&L.latLngBounds(pts).intersects(view))L.polyline(pts,{color:colors[d.d%colors.length],weight:3,opacity:.7}).addTo(lines)}}
+if(bounds.isValid())map.fitBounds(bounds.pad(0.1));else map.setView([0,0],2);
+map.on('zoomend moveend',draw);draw();
+const legs=[];for(const d of DAYS)d.l.forEach((l,i)=>legs.push({d,i,a:l[0],b:l[1]}));
+const stops=DAYS.flatMap(d=>d.s.map(s=>({d,s})));
+const t=document.getElementById('t'),label=document.getElementById('label'),me=L.marker([0,0]).addTo(map);
+const t0=Math.min(...legs.map(l=>l.a),...stops.map(x=>x.s[1])),t1=Math.max(...legs.map(l=>l.b),...stops.map(x=>x.s[2]));
+t.min=t0;t.max=t1;t.value=t0;
+function hhmm(m){const d=Math.floor(m/1440),r=m-d*1440;return 'day '+(d+1)+' '+String(Math.floor(r/60)).padStart(2,'0')+':'+String(Math.floor(r%60)).padStart(2,'0')}
+function along(xy,a,b,f){let total=0;const seg=[];for(let i=a;i<b-1;i++){const l=Math.hypot(xy[2*i+2]-xy[2*i],xy[2*i+3]-xy[2*i+1]);seg.push(l);total+=l}
+  let want=f*total;for(let i=a;i<b-1;i++){const l=seg[i-a];if(want<=l||i==b-2){const u=l?Math.min(1,want/l):0;
+    return [xy[2*i]+u*(xy[2*i+2]-xy[2*i]),xy[2*i+1]+u*(xy[2*i+3]-xy[2*i+1])]}want-=l}return [xy[2*a],xy[2*a+1]]}
+function at(m){for(const x of stops)if(x.s[1]<=m&&m<=x.s[2])return {p:[x.s[3],x.s[4]],text:x.s[0]};
+  for(const l of legs)if(l.a<=m&&m<=l.b){const g=level(l.d,18),a=g.o[l.i],b=g.o[l.i+1];
+    return {p:along(g.xy,a,b,l.b>l.a?(m-l.a)/(l.b-l.a):1),text:'travelling'}}
+  return null}
+function show(){const m=+t.value,x=at(m);label.textContent=hhmm(m)+(x?' — '+x.text:'');if(x)me.setLatLng(x.p)}
+t.oninput=show;show();
+let playing=false,last=0;const play=document.getElementById('play');
+function tick(ts){if(!playing)return;const dt=last?ts-last:0;last=ts;let v=+t.value+dt*0.5;if(v>=t1){v=t1;playing=false;play.innerHTML='&#9654;'}
+  t.value=v;show();requestAnimationFrame(tick)}
+play.onclick=()=>{playing=!playing;last=0;play.innerHTML=playing?'&#10074;&#10074;':'&#9654;';if(playing){if(+t.value>=t1)t.value=t0;requestAnimationFrame(tick)}};
+})();
+</script></body></html>
+"""
+
+
+def write_html(plans: Iterable[DayPlan], out: IO[str], title: str = "Trip") -> None:
+    out.write(HTML_HEAD.format(title=html.escape(title)))
+    for plan in plans:
+        payload = json.dumps(_day_payload(plan), ensure_ascii=False, separators=(",", ":")).replace("<", "\\u003c")
+        out.write(f"<script>day({payload})</script>\n")
+    out.write(HTML_TAIL)
+
+
+def write_gantt(itinerary: dict, out: IO[str], title: str = "Trip") -> None:
+    out.write(f"```mermaid\ngantt\n    title {_mermaid(title)}\n    dateFormat YYYY-MM-DD HH:mm\n    axisFormat %H:%M\n")
+    first = _date(itinerary["days"][0], None)
+    for d, day in enumerate(itinerary["days"]):
+        date = _date(day, first + datetime.timedelta(d))
+        out.write(f"    section Day {d + 1} {date.isoformat()}\n")
+        for stop in day.get("stops", []):
+            start, end = minutes(stop["start"]), minutes(stop["end"])
+            when = datetime.datetime.combine(date, datetime.time()) + datetime.timedelta(minutes=start)
+            out.write(f"    {_mermaid(stop.get('name', 'stop'))} :{when:%Y-%m-%d %H:%M}, {max(end - start, 1)}m\n")
+    out.write("```\n")
+
+
+def _mermaid(text: str) -> str:
+    return text.replace(":", " ").replace("#", " ").replace(";", ",").strip() or "-"
+
+
+def animation_frames(plans: Iterable[DayPlan], step_min: int = 5) -> Iterator[dict]:
+    """Position every ``step_min`` minutes while at a stop or travelling, one frame at a time."""
+    for plan in plans:
+        midnight = datetime.datetime.combine(plan.date, datetime.time())
+        base = plan.index * 1440
+        events = sorted(
+            [(base + minutes(s["start"]), base + minutes(s["end"]), s) for s in plan.stops]
+            + [(leg.depart, leg.arrive, leg) for leg in plan.legs],
+            key=lambda e: e[0],
+        )
+        for start, end, what in events:
+            ticks = np.arange(-(-start // step_min) * step_min, end + 1, step_min)
+            if not len(ticks):
+                continue
+            if isinstance(what, LegPath):
+                lat, lon = _along(what.points, (ticks - start) / (end - start) if end > start else np.ones(len(ticks)))
+                status = "travelling"
+            else:
+                lat, lon = np.full(len(ticks), what["lat"]), np.full(len(ticks), what["lon"])
+                status = what.get("name", "stop")
+            for m, y, x in zip(ticks.tolist(), lat.tolist(), lon.tolist()):
+                when = midnight + datetime.timedelta(minutes=m - base)
+                yield {"t": when.isoformat(timespec="minutes"), "lat": round(y, 5), "lon": round(x, 5), "at": status}
+
+
+def _along(points: list[Point], fractions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Positions at the given fractions of the path length (planar, fine at city scale)."""
+    xy = np.asarray(points, dtype=float)
+    step = np.hypot(np.diff(xy[:, 0]), np.diff(xy[:, 1]) * math.cos(math.radians(xy[0, 0])))
+    cumulative = np.concatenate(([0.0], np.cumsum(step)))
+    if cumulative[-1] == 0:
+        return np.full(len(fractions), xy[0, 0]), np.full(len(fractions), xy[0, 1])
+    target = np.clip(fractions, 0, 1) * cumulative[-1]
+    return np.interp(target, cumulative, xy[:, 0]), np.interp(target, cumulative, xy[:, 1])
+
+
+def render(itinerary: dict, out_dir: str, index=None, frames: bool = False, frame_step: int = 5, title: str = "Trip") -> dict[str, str]:
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {"html": os.path.join(out_dir, "report.html"), "gantt": os.path.join(out_dir, "gantt.md")}
+    days = trip_days(itinerary, index)
+    if frames:
+        days = list(days)  # routed once, read by the page and the frames
+    with open(paths["html"], "w") as f:
+        write_html(days, f, title)
+    with open(paths["gantt"], "w") as f:
+        write_gantt(itinerary, f, title)
+    if frames:
+        paths["frames"] = os.path.join(out_dir, "frames.jsonl")
+        with open(paths["frames"], "w") as f:
+            for frame in animation_frames(days, frame_step):
+                f.write(json.dumps(frame, ensure_ascii=False) + "\n")
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("itinerary", help="itinerary JSON file")
+    parser.add_argument("--out", default="report", help="output directory")
+    parser.add_argument("--index", help="routing index for road geometry (default: straight lines)")
+    parser.add_argument("--frames", action="store_true", help="also write frames.jsonl")
+    parser.add_argument("--frame-step", type=int, default=5, help="minutes between frames")
+    parser.add_argument("--title", default="Trip")
+    args = parser.parse_args()
+    with open(args.itinerary) as f:
+        itinerary = json.load(f)
+    index = None
+    if args.index:
+        from routing import RoutingIndex
+
+        index = RoutingIndex(args.index)
+    for kind, path in render(itinerary, args.out, index, args.frames, args.frame_step, args.title).items():
+        print(f"{kind}: {path} ({os.path.getsize(path) / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,571 @@
+"""Offline travel-time engine on a contraction hierarchy (CH).
+
+The index is built once from an OSM extract and written to a single binary
+file that is memory-mapped at query time, so opening it is instant and
+several processes share the same pages.
+
+    python scripts/routing.py build city.osm.pbf data/city.ch --profile foot
+    python scripts/routing.py query data/city.ch 48.8584,2.2945 48.8606,2.3376
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import math
+import mmap
+import struct
+import sys
+import threading
+from array import array
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+from osm import Node, Way, read_osm
+
+INF = float("inf")
+MAGIC = b"TSKCH001"
+HEADER = struct.Struct("<8sIII16s")
+
+# km/h per highway class; a class missing from a profile is not routable.
+PROFILES: dict[str, dict[str, float]] = {
+    "car": {
+        "motorway": 100, "motorway_link": 60, "trunk": 80, "trunk_link": 50,
+        "primary": 60, "primary_link": 45, "secondary": 50, "secondary_link": 40,
+        "tertiary": 40, "tertiary_link": 35, "unclassified": 30, "residential": 30,
+        "living_street": 10, "service": 15, "road": 30,
+    },
+    "foot": {
+        "trunk": 5, "trunk_link": 5, "primary": 5, "primary_link": 5, "secondary": 5,
+        "secondary_link": 5, "tertiary": 5, "tertiary_link": 5, "unclassified": 5,
+        "residential": 5, "living_street": 5, "service": 5, "road": 5, "pedestrian": 5,
+        "footway": 5, "path": 4.5, "steps": 2, "track": 4.5, "cycleway": 5, "bridleway": 4.5,
+    },
+}
+
+Point = tuple[float, float]
+
+
+def haversine_m(a: Point, b: Point) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 12_742_000 * math.asin(math.sqrt(h))
+
+
+@dataclass
+class Leg:
+    duration_s: float
+    distance_m: float
+
+
+# --------------------------------------------------------------------------- graph
+
+
+def graph_from_osm(path: str, profile: str = "car") -> tuple[list[Point], dict[tuple[int, int], tuple[float, float]]]:
+    """Read a routable graph: node coordinates and ``(u, v) -> (seconds, metres)``."""
+    speeds = PROFILES[profile]
+    coords: dict[int, Point] = {}
+    ways: list[tuple[list[int], float, int]] = []
+    for obj in read_osm(path):
+        if isinstance(obj, Node):
+            coords[obj.id] = (obj.lat, obj.lon)
+        elif isinstance(obj, Way):
+            kmh = speeds.get(obj.tags.get("highway", ""))
+            if kmh is None or obj.tags.get("access") in ("no", "private"):
+                continue
+            if profile == "car":
+                kmh = _maxspeed(obj.tags.get("maxspeed"), kmh)
+            ways.append((obj.refs, kmh, _direction(obj.tags, profile)))
+
+    index: dict[int, int] = {}
+    points: list[Point] = []
+    edges: dict[tuple[int, int], tuple[float, float]] = {}
+    for refs, kmh, direction in ways:
+        refs = [r for r in refs if r in coords]
+        for a, b in zip(refs, refs[1:]):
+            for osm_id in (a, b):
+                if osm_id not in index:
+                    index[osm_id] = len(points)
+                    points.append(coords[osm_id])
+            u, v = index[a], index[b]
+            metres = haversine_m(points[u], points[v])
+            cost = (metres / (kmh / 3.6), metres)
+            if direction >= 0:
+                _add_edge(edges, u, v, cost)
+            if direction <= 0:
+                _add_edge(edges, v, u, cost)
+    return _largest_component(points, edges)
+
+
+def _maxspeed(value: str | None, default: float) -> float:
+    try:
+        return float(value.split()[0]) if value else default
+    except ValueError:
+        return default
+
+
+def _direction(tags: dict[str, str], profile: str) -> int:
+    """1 = forward only, -1 = backward only, 0 = both ways."""
+    if profile != "car":
+        return 0
+    oneway = tags.get("oneway")
+    if oneway == "-1":
+        return -1
+    if oneway in ("yes", "true", "1") or tags.get("junction") == "roundabout":
+        return 1
+    return 0
+
+
+def _add_edge(edges, u: int, v: int, cost: tuple[float, float]) -> None:
+    if u != v and ((u, v) not in edges or cost[0] < edges[u, v][0]):
+        edges[u, v] = cost
+
+
+def _largest_component(points, edges):
+    """Drop islands so every snapped point can reach every other one."""
+    neighbours: list[list[int]] = [[] for _ in points]
+    for u, v in edges:
+        neighbours[u].append(v)
+        neighbours[v].append(u)
+    component = [-1] * len(points)
+    sizes = []
+    for start in range(len(points)):
+        if component[start] >= 0:
+            continue
+        label, stack, size = len(sizes), [start], 0
+        component[start] = label
+        while stack:
+            u = stack.pop()
+            size += 1
+            for v in neighbours[u]:
+                if component[v] < 0:
+                    component[v] = label
+                    stack.append(v)
+        sizes.append(size)
+    if len(sizes) <= 1:
+        return points, edges
+    keep = max(range(len(sizes)), key=sizes.__getitem__)
+    remap = {}
+    for u, label in enumerate(component):
+        if label == keep:
+            remap[u] = len(remap)
+    kept_points = [points[u] for u in remap]
+    kept_edges = {(remap[u], remap[v]): c for (u, v), c in edges.items() if u in remap}
+    return kept_points, kept_edges
+
+
+def dijkstra(adjacency: Sequence[Sequence[tuple[int, float]]], source: int, targets: Iterable[int] = ()) -> dict[int, float]:
+    """Plain Dijkstra on ``adjacency[u] = [(v, seconds), ...]``; the baseline for the benchmarks.
+
+    Stops once every node in ``targets`` is settled (or runs to exhaustion if empty).
+    """
+    remaining = set(targets)
+    settled: dict[int, float] = {}
+    heap = [(0.0, source)]
+    while heap:
+        cost, u = heapq.heappop(heap)
+        if u in settled:
+            continue
+        settled[u] = cost
+        remaining.discard(u)
+        if targets and not remaining:
+            break
+        for v, w in adjacency[u]:
+            if v not in settled:
+                heapq.heappush(heap, (cost + w, v))
+    return settled
+
+
+# --------------------------------------------------------------------------- contraction
+
+
+def contract(n: int, edges: dict[tuple[int, int], tuple[float, float]], witness_settle_limit: int = 500):
+    """Contract all nodes; return per-node upward (``up``) and downward (``down``) edge lists.
+
+    ``up[u]`` holds ``(v, seconds, metres, mid)`` for edges ``u -> v`` to higher
+    ranked nodes; ``down[v]`` holds ``(u, ...)`` for edges ``u -> v`` where ``u``
+    ranks higher.  ``mid`` is the contracted node a shortcut bypasses, or -1.
+    """
+    out_adj: list[dict[int, tuple[float, float, int]]] = [{} for _ in range(n)]
+    in_adj: list[dict[int, tuple[float, float, int]]] = [{} for _ in range(n)]
+    for (u, v), (t, d) in edges.items():
+        out_adj[u][v] = (t, d, -1)
+        in_adj[v][u] = (t, d, -1)
+    up: list[list] = [[] for _ in range(n)]
+    down: list[list] = [[] for _ in range(n)]
+    deleted = [0] * n
+    level = [0] * n
+
+    def shortcuts(v: int) -> list[tuple[int, int, float, float]]:
+        outs = out_adj[v]
+        if not outs or not in_adj[v]:
+            return []
+        max_out = max(t for t, _, _ in outs.values())
+        found = []
+        for u, (tu, du, _) in in_adj[v].items():
+            witness = _witness_search(out_adj, u, v, outs.keys() - {u}, tu + max_out, witness_settle_limit)
+            for w, (tw, dw, _) in outs.items():
+                if w != u and witness.get(w, INF) > tu + tw:
+                    found.append((u, w, tu + tw, du + dw))
+        return found
+
+    def priority(v: int, found: list) -> int:
+        return 2 * len(found) - len(in_adj[v]) - len(out_adj[v]) + deleted[v] + level[v]
+
+    heap = [(priority(v, shortcuts(v)), v) for v in range(n)]
+    heapq.heapify(heap)
+    while heap:
+        _, v = heapq.heappop(heap)
+        found = shortcuts(v)
+        prio = priority(v, found)
+        if heap and prio > heap[0][0]:
+            heapq.heappush(heap, (prio, v))  # lazy update
+            continue
+        up[v] = [(w, *c) for w, c in out_adj[v].items()]
+        down[v] = [(u, *c) for u, c in in_adj[v].items()]
+        for w in out_adj[v]:
+            del in_adj[w][v]
+            deleted[w] += 1
+            level[w] = max(level[w], level[v] + 1)
+        for u in in_adj[v]:
+            del out_adj[u][v]
+            deleted[u] += 1
+            level[u] = max(level[u], level[v] + 1)
+        out_adj[v], in_adj[v] = {}, {}
+        for u, w, t, d in found:
+            existing = out_adj[u].get(w)
+            if existing is None or t < existing[0]:
+                out_adj[u][w] = (t, d, v)
+                in_adj[w][u] = (t, d, v)
+    return up, down
+
+
+def _witness_search(out_adj, source: int, skip: int, targets, limit: float, settle_limit: int) -> dict[int, float]:
+    """Bounded Dijkstra from ``source`` that avoids ``skip``; stops once ``targets`` are settled."""
+    remaining = len(targets)
+    settled: dict[int, float] = {}
+    heap = [(0.0, source)]
+    while heap and remaining and len(settled) < settle_limit:
+        cost, u = heapq.heappop(heap)
+        if cost > limit:
+            break
+        if u in settled:
+            continue
+        settled[u] = cost
+        if u in targets:
+            remaining -= 1
+        for v, (t, _, _) in out_adj[u].items():
+            if v != skip and v not in settled:
+                heapq.heappush(heap, (cost + t, v))
+    return settled
+
+
+# --------------------------------------------------------------------------- index file
+
+
+def build_index(points: list[Point], edges, path: str, profile: str = "car") -> None:
+    up, down = contract(len(points), edges)
+    sections = [
+        array("d", (p[0] for p in points)),
+        array("d", (p[1] for p in points)),
+        *_csr(up),
+        *_csr(down),
+    ]
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(points), len(sections[3]), len(sections[8]), profile.encode()))
+        for section in sections:
+            _pad(f)
+            section.tofile(f)
+
+
+def _csr(adj: list[list]) -> list[array]:
+    offsets, targets, times, dists, mids = array("I", [0]), array("I"), array("d"), array("d"), array("i")
+    for edges in adj:
+        for v, t, d, m in edges:
+            targets.append(v)
+            times.append(t)
+            dists.append(d)
+            mids.append(m)
+        offsets.append(len(targets))
+    return [offsets, targets, times, dists, mids]
+
+
+def _pad(f) -> None:
+    f.write(b"\0" * (-f.tell() % 8))
+
+
+class _Adjacency:
+    __slots__ = ("offsets", "targets", "times", "dists", "mids")
+
+    def __init__(self, offsets, targets, times, dists, mids) -> None:
+        self.offsets, self.targets, self.times, self.dists, self.mids = offsets, targets, times, dists, mids
+
+    def find(self, u: int, v: int) -> int:
+        best, best_time = -1, INF
+        for i in range(self.offsets[u], self.offsets[u + 1]):
+            if self.targets[i] == v and self.times[i] < best_time:
+                best, best_time = i, self.times[i]
+        return best
+
+
+class RoutingIndex:
+    """Read-only, memory-mapped CH index."""
+
+    GRID_DEG = 0.005
+    BACKWARD_CACHE_SIZE = 4096
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        magic, n, m_up, m_down, profile = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a routing index")
+        self.profile = profile.rstrip(b"\0").decode()
+        self.size = n
+        pos = HEADER.size
+        sections = []
+        for fmt, count in (("d", n), ("d", n), *_csr_layout(n, m_up), *_csr_layout(n, m_down)):
+            pos += -pos % 8
+            nbytes = count * struct.calcsize(fmt)
+            sections.append(view[pos:pos + nbytes].cast(fmt))
+            pos += nbytes
+        self.lat, self.lon = sections[0], sections[1]
+        self.up = _Adjacency(*sections[2:7])
+        self.down = _Adjacency(*sections[7:12])
+        self._grid: dict[tuple[int, int], list[int]] | None = None
+        self._bounds = (0, -1, 0, -1)  # grid cell rows and columns in use, set with the grid
+        self._backward_cache: dict[int, list[tuple[int, float, float]]] = {}
+        self._backward_lock = threading.Lock()  # the routing server computes matrices in threads
+
+    def close(self) -> None:
+        for adj in (self.up, self.down):
+            for name in _Adjacency.__slots__:
+                getattr(adj, name).release()
+        self.lat.release()
+        self.lon.release()
+        self._mmap.close()
+        self._file.close()
+
+    # -- snapping
+
+    def nearest(self, point: Point) -> int:
+        """Node closest to ``point`` (straight-line distance), however far outside the network the point is."""
+        if self._grid is None:
+            grid: dict[tuple[int, int], list[int]] = {}
+            g = self.GRID_DEG
+            for i in range(self.size):
+                grid.setdefault((int(self.lat[i] // g), int(self.lon[i] // g)), []).append(i)
+            if grid:
+                rows, cols = [i for i, _ in grid], [j for _, j in grid]
+                self._bounds = (min(rows), max(rows), min(cols), max(cols))
+            self._grid = grid  # published complete: the routing server may snap from a matrix thread too
+        if not self._grid:
+            raise ValueError(f"{self.path} has no nodes")
+        g = self.GRID_DEG
+        ci, cj = int(point[0] // g), int(point[1] // g)
+        i0, i1, j0, j1 = self._bounds
+        # rings wholly outside the grid are empty: start at the first one that reaches it, stop after the last
+        first = max(i0 - ci, ci - i1, j0 - cj, cj - j1, 0)
+        last = max(ci - i0, i1 - ci, cj - j0, j1 - cj)
+        best, best_d = -1, INF
+        for ring in range(first, last + 1):
+            for cell in self._ring(ci, cj, ring):
+                for node in self._grid.get(cell, ()):
+                    d = haversine_m(point, (self.lat[node], self.lon[node]))
+                    if d < best_d:
+                        best, best_d = node, d
+            # on sparse networks a closer node can sit several rings further out
+            if best_d <= self._ring_distance(point, ring + 1):
+                break
+        return best
+
+    def _ring_distance(self, point: Point, ring: int) -> float:
+        """Lower bound in metres from ``point`` to any node in the cells ``ring`` rings out."""
+        g = self.GRID_DEG
+        ci, cj = int(point[0] // g), int(point[1] // g)
+        dlat = min((ci + ring) * g - point[0], point[0] - (ci - ring + 1) * g)
+        dlon = min((cj + ring) * g - point[1], point[1] - (cj - ring + 1) * g)
+        # hav(d) >= cos(lat1) cos(lat2) hav(dlon): bound cos by the ring's most poleward latitude
+        cos = math.cos(math.radians(min(abs(point[0]) + (ring + 1) * g, 90.0)))
+        by_lon = 12_742_000 * math.asin(min(1.0, cos * math.sin(math.radians(max(dlon, 0.0)) / 2)))
+        return min(6_371_000 * math.radians(max(dlat, 0.0)), by_lon)
+
+
+    def _ring(self, ci: int, cj: int, ring: int) -> Iterable[tuple[int, int]]:
+        """Grid cells on the border of the square ``ring`` cells out from ``(ci, cj)``, clipped to the grid."""
+        if ring == 0:
+            yield ci, cj
+            return
+        i0, i1, j0, j1 = self._bounds
+        for i in (ci - ring, ci + ring):
+            if i0 <= i <= i1:
+                for j in range(max(cj - ring, j0), min(cj + ring, j1) + 1):
+                    yield i, j
+        for j in (cj - ring, cj + ring):
+            if j0 <= j <= j1:
+                for i in range(max(ci - ring + 1, i0), min(ci + ring - 1, i1) + 1):
+                    yield i, j
+
+    # -- node level queries
+
+    def _search(self, adj: _Adjacency, source: int) -> dict[int, tuple[float, float, int, int]]:
+        """Upward Dijkstra with stall-on-demand: ``node -> (seconds, metres, parent, edge)``.
+
+        A node is stalled (left out of the result and not expanded) when a
+        higher-ranked node already reaches it more cheaply; such nodes cannot lie
+        on a shortest up-down path.
+        """
+        offsets, targets, times, dists = adj.offsets, adj.targets, adj.times, adj.dists
+        other = self.down if adj is self.up else self.up
+        s_offsets, s_targets, s_times = other.offsets, other.targets, other.times
+        settled: dict[int, tuple[float, float, int, int]] = {}
+        tentative = {source: 0.0}
+        done = set()
+        heap = [(0.0, 0.0, source, -1, -1)]
+        while heap:
+            t, d, u, parent, edge = heapq.heappop(heap)
+            if u in done:
+                continue
+            done.add(u)
+            if any(tentative.get(s_targets[i], INF) + s_times[i] < t for i in range(s_offsets[u], s_offsets[u + 1])):
+                continue
+            settled[u] = (t, d, parent, edge)
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                tv = t + times[i]
+                if tv < tentative.get(v, INF):
+                    tentative[v] = tv
+                    heapq.heappush(heap, (tv, d + dists[i], v, u, i))
+        return settled
+
+    def backward_space(self, target: int) -> list[tuple[int, float, float]]:
+        """Backward search space of ``target``, memoised: POI sets are queried over and over."""
+        with self._backward_lock:
+            space = self._backward_cache.get(target)
+        if space is None:
+            space = [(v, tm, dm) for v, (tm, dm, _, _) in self._search(self.down, target).items()]
+            with self._backward_lock:
+                while len(self._backward_cache) >= self.BACKWARD_CACHE_SIZE:
+                    self._backward_cache.pop(next(iter(self._backward_cache)))
+                self._backward_cache[target] = space
+        return space
+
+    def forward_space(self, source: int) -> list[tuple[int, float, float]]:
+        return [(v, tm, dm) for v, (tm, dm, _, _) in self._search(self.up, source).items()]
+
+    def many_to_many_nodes(self, sources: Sequence[int], targets: Sequence[int]) -> list[list[Leg | None]]:
+        """Bucket-based CH many-to-many: one backward search per target, one forward per source."""
+        buckets: dict[int, list[tuple[int, float, float]]] = {}
+        for j, t in enumerate(targets):
+            for v, tm, dm in self.backward_space(t):
+                buckets.setdefault(v, []).append((j, tm, dm))
+        rows = []
+        for s in sources:
+            best_t = [INF] * len(targets)
+            best_d = [INF] * len(targets)
+            for v, tm, dm in self.forward_space(s):
+                for j, bt, bd in buckets.get(v, ()):
+                    if tm + bt < best_t[j]:
+                        best_t[j], best_d[j] = tm + bt, dm + bd
+            rows.append([Leg(t, d) if t < INF else None for t, d in zip(best_t, best_d)])
+        return rows
+
+    def route_nodes(self, s: int, t: int) -> tuple[Leg | None, list[int]]:
+        forward, backward = self._search(self.up, s), self._search(self.down, t)
+        meet, best = -1, INF
+        for v, (tm, _, _, _) in forward.items():
+            if v in backward and tm + backward[v][0] < best:
+                meet, best = v, tm + backward[v][0]
+        if meet < 0:
+            return None, []
+        packed: list[tuple[int, int, int]] = []
+        v = meet
+        while forward[v][2] >= 0:
+            _, _, parent, edge = forward[v]
+            packed.append((parent, v, self.up.mids[edge]))
+            v = parent
+        packed.reverse()
+        v = meet
+        while backward[v][2] >= 0:
+            _, _, parent, edge = backward[v]
+            packed.append((v, parent, self.down.mids[edge]))
+            v = parent
+        nodes = [s]
+        for a, b, mid in packed:
+            nodes.extend(self._unpack(a, b, mid))
+        return Leg(best, forward[meet][1] + backward[meet][1]), nodes
+
+    def _unpack(self, a: int, b: int, mid: int) -> list[int]:
+        """Expand shortcut ``a -> b`` into the original nodes after ``a``."""
+        out: list[int] = []
+        stack = [(a, b, mid)]
+        while stack:
+            u, v, m = stack.pop()
+            if m < 0:
+                out.append(v)
+                continue
+            stack.append((m, v, self._mid(m, v)))
+            stack.append((u, m, self._mid(u, m)))
+        return out
+
+    def _mid(self, u: int, v: int) -> int:
+        i = self.up.find(u, v)
+        if i >= 0:
+            return self.up.mids[i]
+        return self.down.mids[self.down.find(v, u)]
+
+    # -- coordinate level queries
+
+    def travel_time(self, origin: Point, destination: Point) -> Leg | None:
+        return self.one_to_many(origin, [destination])[0]
+
+    def one_to_many(self, origin: Point, destinations: Sequence[Point]) -> list[Leg | None]:
+        return self.many_to_many_nodes([self.nearest(origin)], [self.nearest(p) for p in destinations])[0]
+
+    def route(self, origin: Point, destination: Point) -> tuple[Leg | None, list[Point]]:
+        leg, nodes = self.route_nodes(self.nearest(origin), self.nearest(destination))
+        return leg, [(self.lat[v], self.lon[v]) for v in nodes]
+
+
+def _csr_layout(n: int, m: int) -> list[tuple[str, int]]:
+    return [("I", n + 1), ("I", m), ("d", m), ("d", m), ("i", m)]
+
+
+# --------------------------------------------------------------------------- cli
+
+
+def _point(text: str) -> Point:
+    lat, lon = text.split(",")
+    return float(lat), float(lon)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="build a CH index from an OSM extract")
+    build.add_argument("extract")
+    build.add_argument("index")
+    build.add_argument("--profile", choices=sorted(PROFILES), default="car")
+    query = sub.add_parser("query", help="travel time from the first point to the others")
+    query.add_argument("index")
+    query.add_argument("origin", type=_point)
+    query.add_argument("destinations", type=_point, nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        points, edges = graph_from_osm(args.extract, args.profile)
+        print(f"{len(points)} nodes, {len(edges)} edges; contracting...", file=sys.stderr)
+        build_index(points, edges, args.index, args.profile)
+    else:
+        index = RoutingIndex(args.index)
+        for point, leg in zip(args.destinations, index.one_to_many(args.origin, args.destinations)):
+            if leg is None:
+                print(f"{point[0]},{point[1]}\tunreachable")
+            else:
+                print(f"{point[0]},{point[1]}\t{leg.duration_s:.0f} s\t{leg.distance_m:.0f} m")
+
+
+if __name__ == "__main__":
+    main()
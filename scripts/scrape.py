@@ -0,0 +1,380 @@
+"""Parallel scraping of opening hours, prices and ticket availability.
+
+A warm pool of headless browser contexts (Playwright's Python API, the same
+engine the ``playwright`` MCP server drives) drains a bounded work queue of
+URLs, with a per-domain concurrency limit.  Images, fonts, media, stylesheets and
+known ad hosts are blocked at the network layer.  Each page's result is
+written to SQLite as soon as it is extracted.
+
+    pip install playwright && playwright install chromium
+    python scripts/scrape.py urls.txt --store data/scrape.sqlite --pool 4 --per-domain 2
+
+``--fetcher http`` skips the browser (plain HTTP GET) for static pages.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Callable, Protocol
+from urllib.parse import urlsplit
+
+from opening_hours import Hours, parse_osm, parse_schema_org
+
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media", "stylesheet"}
+AD_HOSTS = re.compile(r"(^|\.)(doubleclick\.net|googlesyndication\.com|googletagmanager\.com|google-analytics\.com"
+                      r"|adservice\.google\.com|facebook\.net|criteo\.com|taboola\.com|outbrain\.com)$")
+AD_PATHS = re.compile(r"/ads?/|/adserver/|/banners?/")
+
+
+# --------------------------------------------------------------------------- extraction
+
+
+@dataclass
+class Extracted:
+    opening_hours: Hours | None = None
+    price: float | None = None
+    currency: str | None = None
+    availability: str | None = None  # available | sold_out | None
+
+
+class _PageText(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__()
+        self.json_ld: list[str] = []
+        self.text: list[str] = []
+        self._in_json_ld = False
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "script":
+            self._in_json_ld = dict(attrs).get("type") == "application/ld+json"
+            if self._in_json_ld:
+                self.json_ld.append("")
+            else:
+                self._skip += 1
+        elif tag == "style":
+            self._skip += 1
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self._in_json_ld:
+            self._in_json_ld = False
+        elif tag in ("script", "style") and self._skip:
+            self._skip -= 1
+
+    def handle_data(self, data):
+        if self._in_json_ld:
+            self.json_ld[-1] += data
+        elif not self._skip:
+            self.text.append(data)
+
+
+_PRICE = re.compile(r"([€$£])\s?(\d+(?:[.,]\d{1,2})?)|(\d+(?:[.,]\d{1,2})?)\s?(EUR|USD|GBP|€)", re.IGNORECASE)
+_SYMBOLS = {"€": "EUR", "$": "USD", "£": "GBP"}
+_OSM_HOURS = re.compile(r"((?:(?:Mo|Tu|We|Th|Fr|Sa|Su)(?:-(?:Mo|Tu|We|Th|Fr|Sa|Su))?,?)+\s+\d{1,2}:\d{2}-\d{1,2}:\d{2}"
+                        r"(?:,\d{1,2}:\d{2}-\d{1,2}:\d{2})*)")
+_SOLD_OUT = re.compile(r"sold[ -]out|no tickets|fully booked|ausverkauft|\bcomplet\b", re.IGNORECASE)
+_AVAILABLE = re.compile(r"tickets? available|book now|buy tickets?|in stock", re.IGNORECASE)
+
+
+def extract(html: str) -> Extracted:
+    """Structured data (schema.org JSON-LD) first, text patterns as a fallback."""
+    parser = _PageText()
+    parser.feed(html)
+    out = Extracted()
+    for block in parser.json_ld:
+        try:
+            data = json.loads(block)
+        except json.JSONDecodeError:
+            continue
+        for node in _walk(data):
+            if out.opening_hours is None and "openingHoursSpecification" in node:
+                out.opening_hours = parse_schema_org(node["openingHoursSpecification"]) or None
+            if out.opening_hours is None and isinstance(node.get("openingHours"), (str, list)):
+                spec = node["openingHours"]
+                out.opening_hours = parse_osm("; ".join(spec) if isinstance(spec, list) else spec)
+            if out.price is None and "offers" in node:
+                _offers(node["offers"], out)
+
+    text = " ".join(" ".join(parser.text).split())
+    if out.opening_hours is None and (rules := _OSM_HOURS.findall(text)):
+        out.opening_hours = parse_osm("; ".join(rules))
+    if out.price is None and (m := _PRICE.search(text)):
+        amount = m[2] or m[3]
+        out.price = float(amount.replace(",", "."))
+        unit = (m[1] or m[4]).upper()
+        out.currency = _SYMBOLS.get(unit, unit)
+    if out.availability is None:
+        if _SOLD_OUT.search(text):
+            out.availability = "sold_out"
+        elif _AVAILABLE.search(text):
+            out.availability = "available"
+    return out
+
+
+def _walk(data):
+    if isinstance(data, list):
+        for item in data:
+            yield from _walk(item)
+    elif isinstance(data, dict):
+        yield data
+        yield from _walk(data.get("@graph", []))
+
+
+def _offers(offers, out: Extracted) -> None:
+    for offer in offers if isinstance(offers, list) else [offers]:
+        try:
+            price = float(str(offer.get("price", offer.get("lowPrice"))).replace(",", "."))
+        except ValueError:
+            continue
+        if out.price is None or price < out.price:
+            out.price, out.currency = price, offer.get("priceCurrency")
+        availability = str(offer.get("availability", "")).rsplit("/", 1)[-1]
+        if availability in ("SoldOut", "OutOfStock"):
+            out.availability = out.availability or "sold_out"
+        elif availability in ("InStock", "LimitedAvailability", "OnlineOnly", "PreOrder"):
+            out.availability = "available"
+
+
+# --------------------------------------------------------------------------- fetching
+
+
+@dataclass
+class Page:
+    url: str
+    status: int
+    html: str
+    bytes: int  # response bytes transferred for the page and everything it loaded
+    blocked: int = 0  # sub-requests aborted by resource blocking
+
+
+class Fetcher(Protocol):
+    size: int
+
+    async def fetch(self, url: str) -> Page: ...
+
+
+class BrowserPool:
+    """``size`` warm browser contexts handed out one page load at a time."""
+
+    def __init__(self, size: int = 4, block_resources: bool = True, timeout_s: float = 30.0) -> None:
+        self.size = size
+        self.block_resources = block_resources
+        self.timeout_ms = timeout_s * 1000
+        self._contexts: asyncio.Queue = asyncio.Queue()
+
+    async def __aenter__(self) -> "BrowserPool":
+        try:
+            from playwright.async_api import async_playwright
+        except ImportError as exc:
+            raise SystemExit("the browser pool needs playwright: pip install playwright && playwright install chromium") from exc
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=True)
+        for _ in range(self.size):
+            self._contexts.put_nowait(await self._browser.new_context(service_workers="block"))
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self._browser.close()
+        await self._playwright.stop()
+
+    async def fetch(self, url: str) -> Page:
+        context = await self._contexts.get()
+        page = None
+        blocked = 0
+        sizes: list[asyncio.Task] = []
+
+        async def route(r) -> None:
+            nonlocal blocked
+            request = r.request
+            if self.block_resources and (request.resource_type in BLOCKED_RESOURCE_TYPES or is_ad(request.url)):
+                blocked += 1
+                await r.abort()
+            else:
+                await r.continue_()
+
+        try:
+            page = await context.new_page()
+            await page.route("**/*", route)
+            page.on("requestfinished", lambda request: sizes.append(asyncio.ensure_future(request.sizes())))
+            response = await page.goto(url, wait_until="domcontentloaded", timeout=self.timeout_ms)
+            html = await page.content()
+        finally:
+            try:
+                measured = await asyncio.gather(*sizes, return_exceptions=True)
+                if page is not None:
+                    await page.close()
+                await asyncio.gather(*sizes[len(measured):], return_exceptions=True)  # finished while closing
+            finally:
+                self._contexts.put_nowait(context)
+        transferred = sum(s["responseBodySize"] + s["responseHeadersSize"] for s in measured if isinstance(s, dict))
+        return Page(url, response.status if response else 0, html, transferred, blocked)
+
+
+class HttpFetcher:
+    """Plain HTTP GET in worker threads: no JavaScript, no sub-resources."""
+
+    def __init__(self, size: int = 4, timeout_s: float = 30.0) -> None:
+        self.size = size
+        self.timeout_s = timeout_s
+
+    async def __aenter__(self) -> "HttpFetcher":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        pass
+
+    async def fetch(self, url: str) -> Page:
+        return await asyncio.to_thread(self._get, url)
+
+    def _get(self, url: str) -> Page:
+        request = urllib.request.Request(url, headers={"User-Agent": "tourism-skills-scraper"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout_s) as response:
+                body = response.read()
+                return Page(url, response.status, body.decode(response.headers.get_content_charset() or "utf-8", "replace"), len(body))
+        except urllib.error.HTTPError as exc:
+            return Page(url, exc.code, "", 0)
+
+
+def is_ad(url: str) -> bool:
+    parts = urlsplit(url)
+    return bool(AD_HOSTS.search(parts.hostname or "") or AD_PATHS.search(parts.path))
+
+
+# --------------------------------------------------------------------------- store
+
+
+class ResultStore:
+    """SQLite table of per-URL results, committed as each one arrives."""
+
+    def __init__(self, path: str) -> None:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY, domain TEXT, fetched_at REAL, status INTEGER, error TEXT,"
+            " opening_hours TEXT, price REAL, currency TEXT, availability TEXT, bytes INTEGER)"
+        )
+        self.db.commit()
+
+    def put(self, url: str, page: Page | None, extracted: Extracted | None, error: str | None = None) -> None:
+        self.db.execute(
+            "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                url, urlsplit(url).netloc, time.time(), page.status if page else None, error,
+                json.dumps(extracted.opening_hours) if extracted and extracted.opening_hours else None,
+                extracted.price if extracted else None, extracted.currency if extracted else None,
+                extracted.availability if extracted else None, page.bytes if page else None,
+            ),
+        )
+        self.db.commit()
+
+    def rows(self) -> list[dict]:
+        cursor = self.db.execute("SELECT * FROM pages ORDER BY url")
+        names = [c[0] for c in cursor.description]
+        return [dict(zip(names, row)) for row in cursor]
+
+
+# --------------------------------------------------------------------------- pipeline
+
+
+@dataclass
+class Stats:
+    pages: int = 0
+    errors: int = 0
+    bytes: int = 0
+    blocked: int = 0
+    seconds: float = 0.0
+    per_domain_peak: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def pages_per_s(self) -> float:
+        return self.pages / self.seconds if self.seconds else 0.0
+
+
+async def scrape(
+    urls: list[str],
+    fetcher: Fetcher,
+    store: ResultStore,
+    per_domain: int = 2,
+    on_result: Callable[[str, Extracted | None], None] | None = None,
+) -> Stats:
+    """Fetch ``urls`` with ``fetcher.size`` workers, at most ``per_domain`` at a time per host."""
+    queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=fetcher.size * 2)
+    hosts: dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(per_domain))
+    active: dict[str, int] = defaultdict(int)
+    stats = Stats()
+    start = time.perf_counter()
+
+    async def produce() -> None:
+        for url in urls:
+            await queue.put(url)
+        for _ in range(fetcher.size):
+            await queue.put(None)  # one stop marker per worker
+
+    async def worker() -> None:
+        while (url := await queue.get()) is not None:
+            await fetch(url)
+
+    async def fetch(url: str) -> None:
+        domain = urlsplit(url).netloc
+        async with hosts[domain]:  # a busy host parks this worker without spinning
+            active[domain] += 1
+            stats.per_domain_peak[domain] = max(stats.per_domain_peak.get(domain, 0), active[domain])
+            try:
+                page = await fetcher.fetch(url)
+                extracted = extract(page.html) if page.status < 400 else None
+                store.put(url, page, extracted, None if extracted else f"HTTP {page.status}")
+                stats.pages += 1
+                stats.bytes += page.bytes
+                stats.blocked += page.blocked
+            except Exception as exc:  # one bad page must not stop the batch
+                store.put(url, None, None, f"{type(exc).__name__}: {exc}")
+                stats.errors += 1
+                extracted = None
+            finally:
+                active[domain] -= 1
+        if on_result is not None:
+            on_result(url, extracted)
+
+    await asyncio.gather(produce(), *(worker() for _ in range(fetcher.size)))
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+async def _main(args: argparse.Namespace) -> None:
+    with open(args.urls) as f:
+        urls = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    fetcher = HttpFetcher(args.pool) if args.fetcher == "http" else BrowserPool(args.pool, not args.no_block)
+    async with fetcher:
+        stats = await scrape(urls, fetcher, ResultStore(args.store), args.per_domain,
+                             lambda url, e: print(url, "ok" if e else "failed", flush=True))
+    print(f"{stats.pages} pages, {stats.errors} errors, {stats.pages_per_s:.1f} pages/s, "
+          f"{stats.bytes / 1e6:.1f} MB, {stats.blocked} requests blocked")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("urls", help="file with one URL per line")
+    parser.add_argument("--store", default="data/scrape.sqlite")
+    parser.add_argument("--pool", type=int, default=4, help="browser contexts (or HTTP workers)")
+    parser.add_argument("--per-domain", type=int, default=2, help="concurrent pages per host")
+    parser.add_argument("--fetcher", choices=("browser", "http"), default="browser")
+    parser.add_argument("--no-block", action="store_true", help="load images, fonts, media and ads too")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
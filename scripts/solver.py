@@ -0,0 +1,451 @@
+"""Multi-day itinerary solver: orienteering with time windows.
+
+Picks and orders POIs into day routes that leave the hotel the traveller
+woke up in (the previous night's) and end at that night's hotel, respecting opening hours, visit durations and the day's time span.
+Higher-priority POIs are preferred; travel time breaks ties.  Construction
+by cheapest feasible insertion, then local search (2-opt, or-opt relocate,
+insert/swap of unvisited POIs) until no move improves or the wall-clock
+budget runs out.  Candidate moves are screened with vectorised NumPy deltas
+over a precomputed travel-time matrix; only improving candidates get an
+exact time-window check.
+
+A problem is JSON::
+
+    {
+      "pois": [{"name": "Louvre", "lat": 48.861, "lon": 2.336, "duration_min": 150, "priority": 10,
+                "opening_hours": [["09:00", "18:00"]]}],              # or {"mon": [...], "tue": [...], ...}
+      "days": [{"date": "2026-05-01", "start": "09:00", "end": "21:00",
+                "hotel": {"name": "H", "lat": 48.85, "lon": 2.35}}]
+    }
+
+Opening hours with a midday break are treated as the longest single window.
+The output is an itinerary in the format ``validator.py`` checks.
+
+    python scripts/solver.py problem.json [--index data/city.ch] [--time-limit 3] > itinerary.json
+    python scripts/solver.py problem.json --matrix-handle 3f2a... --cache-dir data/city.matrices
+
+With ``--index`` the matrix is cached next to the index, where the
+``osm_routing`` MCP server keeps its own; ``--matrix-handle`` reuses a
+matrix it already returned.  That matrix must cover the problem's points
+in node order: each distinct hotel in day order, then the POIs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from opening_hours import WEEKDAYS, hhmm
+from validator import DEFAULT_SPEED_KMH, DETOUR_FACTOR, minutes
+
+# Score = sum(priority) - TRAVEL_WEIGHT * travel minutes: priority dominates, travel breaks ties.
+TRAVEL_WEIGHT = 0.01
+UNREACHABLE_MIN = 1e6
+MAX_EXACT_CHECKS = 8
+
+
+def travel_matrix(points: list[tuple[float, float]], index=None, cache=None, handle: str | None = None) -> np.ndarray:
+    """Travel minutes between all points: a cached matrix by ``handle``, the routing index, else a distance estimate."""
+    if handle is not None:
+        matrix = cache.get(handle) if cache is not None else None
+        if matrix is None:
+            raise KeyError(f"no cached matrix {handle}")
+        expected = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        for name, got in (("origins", matrix.origins), ("destinations", matrix.destinations)):
+            if got.shape != expected.shape or not np.allclose(got, expected, atol=1e-6):
+                raise ValueError(f"matrix {handle}: its {name} are not the problem's {len(points)} points in node order")
+        minutes_ = matrix.durations / 60.0
+        return np.where(np.isinf(minutes_), UNREACHABLE_MIN, minutes_)
+    if index is not None:
+        from matrix import distance_matrix
+
+        minutes_ = distance_matrix(index, points, points, cache).durations / 60.0
+        return np.where(np.isinf(minutes_), UNREACHABLE_MIN, minutes_)
+    pts = np.radians(np.asarray(points, dtype=np.float64).reshape(-1, 2))
+    lat, lon = pts[:, :1], pts[:, 1:]
+    h = np.sin((lat.T - lat) / 2) ** 2 + np.cos(lat) * np.cos(lat.T) * np.sin((lon.T - lon) / 2) ** 2
+    metres = 12_742_000 * np.arcsin(np.sqrt(h)) * DETOUR_FACTOR
+    return metres / (DEFAULT_SPEED_KMH * 1000 / 60)
+
+
+@dataclass
+class Problem:
+    """Nodes ``0..H-1`` are hotels, ``H..`` are POIs; every per-node array is indexed by node."""
+
+    problem: dict
+    names: list[str]
+    travel: np.ndarray  # (nodes, nodes) minutes
+    duration: np.ndarray  # (nodes,)
+    priority: np.ndarray  # (nodes,)
+    open: np.ndarray  # (days, nodes) minutes, inf where closed
+    close: np.ndarray  # (days, nodes)
+    day_start: np.ndarray  # (days,)
+    day_end: np.ndarray
+    hotel: np.ndarray  # (days,) hotel node of each day
+    n_hotels: int
+    origin: np.ndarray | None = None  # (days,) node each day's route leaves from; see __post_init__
+
+    def __post_init__(self) -> None:
+        if self.origin is None:
+            # the traveller wakes where they slept: the previous night's hotel (day 0: its own), unless
+            # re-planning overrides it with the last visited stop or the live position
+            self.origin = np.concatenate((self.hotel[:1], self.hotel[:-1]))
+
+    @classmethod
+    def from_json(cls, problem: dict, travel: np.ndarray | None = None, index=None, cache=None,
+                  handle: str | None = None) -> "Problem":
+        days, pois = problem["days"], problem["pois"]
+        hotels: list[dict] = []
+        hotel_of_day = []
+        for day in days:
+            key = (day["hotel"]["lat"], day["hotel"]["lon"])
+            found = next((i for i, h in enumerate(hotels) if (h["lat"], h["lon"]) == key), None)
+            if found is None:
+                found = len(hotels)
+                hotels.append(day["hotel"])
+            hotel_of_day.append(found)
+        nodes = hotels + pois
+        if travel is None:
+            travel = travel_matrix([(n["lat"], n["lon"]) for n in nodes], index, cache, handle)
+        H, n = len(hotels), len(nodes)
+        duration = np.zeros(n)
+        priority = np.zeros(n)
+        open_ = np.full((len(days), n), np.inf)
+        close = np.full((len(days), n), -np.inf)
+        for p, poi in enumerate(pois, start=H):
+            duration[p] = np.ceil(poi.get("duration_min", 60))
+            priority[p] = poi.get("priority", 1)
+            for d, day in enumerate(days):
+                window = _window(poi.get("opening_hours"), day.get("date"))
+                if window is not None:
+                    open_[d, p], close[d, p] = window
+        return cls(
+            # whole minutes throughout, so the printed HH:MM schedule is exactly the one checked
+            problem, [n.get("name", f"node {i}") for i, n in enumerate(nodes)], np.ceil(np.asarray(travel, dtype=np.float64)),
+            duration, priority, open_, close,
+            np.array([minutes(d.get("start", "09:00")) for d in days], dtype=np.float64),
+            np.array([minutes(d.get("end", "21:00")) for d in days], dtype=np.float64),
+            np.array(hotel_of_day), H,
+        )
+
+    @property
+    def pois(self) -> range:
+        return range(self.n_hotels, self.n_hotels + len(self.problem["pois"]))
+
+
+def _window(hours, date: str | None) -> tuple[float, float] | None:
+    """The longest opening window on ``date``; None if closed. No hours means always open."""
+    if hours is None:
+        return 0.0, 48 * 60.0
+    if isinstance(hours, dict):
+        if date is None:
+            return None
+        hours = hours.get(WEEKDAYS[datetime.date.fromisoformat(date).weekday()], [])
+    if not hours:
+        return None
+    o, c = max(((minutes(o), minutes(c)) for o, c in hours), key=lambda w: w[1] - w[0])
+    return float(o), float(c)
+
+
+@dataclass
+class Route:
+    """One day's POI sequence with cached schedule arrays (positions 0..k-1)."""
+
+    day: int
+    nodes: list[int] = field(default_factory=list)
+    start: np.ndarray = field(default_factory=lambda: np.empty(0))  # service start per position
+    latest: np.ndarray = field(default_factory=lambda: np.empty(0))  # latest feasible arrival per position
+
+
+class Solver:
+    def __init__(self, problem: Problem, time_limit_s: float = 3.0) -> None:
+        self.p = problem
+        self.time_limit_s = time_limit_s
+        self.routes = [Route(d) for d in range(len(problem.day_start))]
+        self.active = self.routes  # routes moves may touch; re-planning leaves past days out
+        self.pinned: set[int] = set()  # stops that may move within their day but never leave the plan
+        self.unassigned: set[int] = set(problem.pois)
+        for r in self.routes:
+            self._refresh(r)
+
+    # -- schedule bookkeeping
+
+    def schedule(self, day: int, nodes: list[int]) -> np.ndarray | None:
+        """Service start times, or None if the sequence breaks a window or the day's end."""
+        p, hotel = self.p, self.p.hotel[day]
+        t, prev = p.day_start[day], p.origin[day]
+        starts = np.empty(len(nodes))
+        for k, v in enumerate(nodes):
+            t = max(t + p.travel[prev, v], p.open[day, v])
+            if t + p.duration[v] > p.close[day, v]:
+                return None
+            starts[k] = t
+            t += p.duration[v]
+            prev = v
+        if t + p.travel[prev, hotel] > p.day_end[day]:
+            return None
+        return starts
+
+    def _refresh(self, route: Route, starts: np.ndarray | None = None) -> None:
+        p, d = self.p, route.day
+        route.start = self.schedule(d, route.nodes) if starts is None else starts
+        latest = np.empty(len(route.nodes))
+        nxt, nxt_latest = p.hotel[d], p.day_end[d]
+        for k in range(len(route.nodes) - 1, -1, -1):
+            v = route.nodes[k]
+            latest[k] = min(p.close[d, v], nxt_latest - p.travel[v, nxt]) - p.duration[v]
+            nxt, nxt_latest = v, latest[k]
+        route.latest = latest
+
+    def route_travel(self, route: Route) -> float:
+        seq = [self.p.origin[route.day], *route.nodes, self.p.hotel[route.day]]
+        return float(self.p.travel[seq[:-1], seq[1:]].sum())
+
+    def score(self) -> float:
+        visited = [v for r in self.routes for v in r.nodes]
+        return float(self.p.priority[visited].sum()) - TRAVEL_WEIGHT * sum(self.route_travel(r) for r in self.routes)
+
+    # -- insertion
+
+    def insertion(self, route: Route, v: int) -> tuple[float, int]:
+        """Cheapest feasible ``(added travel, position)`` for ``v`` in ``route``; ``(inf, -1)`` if none."""
+        p, d = self.p, route.day
+        if not np.isfinite(p.open[d, v]):
+            return np.inf, -1
+        hotel = p.hotel[d]
+        prevs = np.array([p.origin[d], *route.nodes])
+        nexts = np.array([*route.nodes, hotel])
+        depart = np.concatenate(([p.day_start[d]], route.start + p.duration[route.nodes]))
+        latest_next = np.concatenate((route.latest, [p.day_end[d]]))
+        begin = np.maximum(depart + p.travel[prevs, v], p.open[d, v])
+        finish = begin + p.duration[v]
+        ok = (finish <= p.close[d, v]) & (finish + p.travel[v, nexts] <= latest_next)
+        if not ok.any():
+            return np.inf, -1
+        added = np.where(ok, p.travel[prevs, v] + p.travel[v, nexts] - p.travel[prevs, nexts], np.inf)
+        k = int(added.argmin())
+        return float(added[k]), k
+
+    def best_insertion(self, v: int) -> tuple[float, Route | None, int]:
+        best = (np.inf, None, -1)
+        for r in self.active:
+            cost, k = self.insertion(r, v)
+            if cost < best[0]:
+                best = (cost, r, k)
+        return best
+
+    def insert(self, route: Route, v: int, k: int) -> None:
+        route.nodes.insert(k, v)
+        self.unassigned.discard(v)
+        self._refresh(route)
+
+    def construct(self) -> None:
+        """Cheapest insertion, highest priority per visit-minute first."""
+        p = self.p
+        for v in sorted(self.unassigned, key=lambda v: -p.priority[v] / max(p.duration[v], 1.0)):
+            cost, route, k = self.best_insertion(v)
+            if route is not None:
+                self.insert(route, v, k)
+
+    # -- local search
+
+    def two_opt(self, route: Route) -> bool:
+        """Apply the best-screened improving segment reversal that keeps the day feasible."""
+        n = len(route.nodes)
+        if n < 3:
+            return False
+        T, h = self.p.travel, self.p.hotel[route.day]
+        seq = np.array([self.p.origin[route.day], *route.nodes, h])
+        fwd = np.concatenate(([0.0], np.cumsum(T[seq[:-1], seq[1:]])))  # cost of seq[0..k]
+        bwd = np.concatenate(([0.0], np.cumsum(T[seq[1:], seq[:-1]])))  # same arcs reversed
+        i = np.arange(1, n + 1)[:, None]  # reverse seq[i..j]
+        j = np.arange(1, n + 1)[None, :]
+        inner_old = fwd[j] - fwd[i]
+        inner_new = bwd[j] - bwd[i]
+        delta = (T[seq[i - 1], seq[j]] + T[seq[i], seq[np.minimum(j + 1, n + 1)]] + inner_new
+                 - T[seq[i - 1], seq[i]] - T[seq[j], seq[np.minimum(j + 1, n + 1)]] - inner_old)
+        delta = np.where(j > i, delta, np.inf)
+        for flat in np.argsort(delta, axis=None):
+            if delta.flat[flat] >= -1e-9:
+                break
+            a, b = divmod(int(flat), n)
+            nodes = route.nodes[:a] + route.nodes[a:b + 1][::-1] + route.nodes[b + 1:]
+            starts = self.schedule(route.day, nodes)
+            if starts is not None:
+                route.nodes = nodes
+                self._refresh(route, starts)
+                return True
+        return False
+
+    def relocate(self, route: Route, max_len: int = 3) -> bool:
+        """Or-opt: move a segment of 1..max_len stops to its cheapest feasible place in any day."""
+        T, h = self.p.travel, self.p.hotel[route.day]
+        n = len(route.nodes)
+        seq = [self.p.origin[route.day], *route.nodes, h]
+        for length in range(1, min(max_len, n) + 1):
+            for a in range(1, n - length + 2):
+                b = a + length - 1
+                gain = T[seq[a - 1], seq[a]] + T[seq[b], seq[b + 1]] - T[seq[a - 1], seq[b + 1]]
+                segment = route.nodes[a - 1:b]
+                rest = route.nodes[:a - 1] + route.nodes[b:]
+                stays = not self.pinned.isdisjoint(segment)
+                for target in self.active:
+                    if stays and target is not route:
+                        continue
+                    base = rest if target is route else target.nodes
+                    cost, k = self._segment_insertion(target.day, base, segment)
+                    if cost < gain - 1e-9:
+                        if target is route:
+                            route.nodes = base[:k] + segment + base[k:]
+                            self._refresh(route)
+                        else:
+                            target.nodes = base[:k] + segment + base[k:]
+                            route.nodes = rest
+                            self._refresh(target)
+                            self._refresh(route)
+                        return True
+        return False
+
+    def _segment_insertion(self, day: int, base: list[int], segment: list[int]) -> tuple[float, int]:
+        T, h = self.p.travel, self.p.hotel[day]
+        prevs = np.array([self.p.origin[day], *base])
+        nexts = np.array([*base, h])
+        first, last = segment[0], segment[-1]
+        added = T[prevs, first] + T[last, nexts] - T[prevs, nexts]
+        # exact checks are the expensive part; only try the cheapest few positions
+        for k in np.argsort(added)[:MAX_EXACT_CHECKS]:
+            if not np.isfinite(added[k]):
+                break
+            nodes = base[:k] + segment + base[k:]
+            if self.schedule(day, nodes) is not None:
+                return float(added[k]), int(k)
+        return np.inf, -1
+
+    def fill(self) -> bool:
+        """Insert unvisited POIs where they fit; swap out a lower-priority stop if that is the only way."""
+        p = self.p
+        improved = False
+        for v in sorted(self.unassigned, key=lambda v: -p.priority[v]):
+            cost, route, k = self.best_insertion(v)
+            if route is not None:
+                self.insert(route, v, k)
+                improved = True
+                continue
+            for r in self.active:
+                for pos, u in enumerate(r.nodes):
+                    if p.priority[u] >= p.priority[v] or u in self.pinned:
+                        continue
+                    nodes = r.nodes[:pos] + r.nodes[pos + 1:]
+                    trial = Route(r.day, nodes)
+                    self._refresh(trial)
+                    if trial.start is None:
+                        continue
+                    cost, k = self.insertion(trial, v)
+                    if k >= 0:
+                        r.nodes = nodes[:k] + [v] + nodes[k:]
+                        self._refresh(r)
+                        self.unassigned.discard(v)
+                        self.unassigned.add(u)
+                        improved = True
+                        break
+                else:
+                    continue
+                break
+        return improved
+
+    def solve(self) -> "Solver":
+        deadline = time.perf_counter() + self.time_limit_s
+        self.construct()
+        self.improve(deadline)
+        return self
+
+    def improve(self, deadline: float) -> None:
+        """Local search over the active routes until nothing improves or ``deadline`` passes."""
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            for r in self.active:
+                while time.perf_counter() < deadline and self.two_opt(r):
+                    improved = True
+            for r in self.active:
+                while time.perf_counter() < deadline and self.relocate(r):
+                    improved = True
+            if time.perf_counter() < deadline and self.fill():
+                improved = True
+
+    # -- output
+
+    def itinerary(self) -> dict:
+        p, problem = self.p, self.p.problem
+        pois = problem["pois"]
+        days = [{**{k: v for k, v in day.items() if k not in ("start", "end")}, "stops": self.day_stops(r)}
+                for r, day in zip(self.routes, problem["days"])]
+        out = {k: v for k, v in problem.items() if k not in ("pois", "days")}
+        out["days"] = days
+        out["unvisited"] = [pois[v - p.n_hotels].get("name", p.names[v]) for v in sorted(self.unassigned)]
+        return out
+
+    def day_stops(self, route: Route) -> list[dict]:
+        """Validator-format stops of one route."""
+        p = self.p
+        pois, date = p.problem["pois"], p.problem["days"][route.day].get("date")
+        stops, prev = [], p.origin[route.day]
+        for v, start in zip(route.nodes, route.start):
+            poi = pois[v - p.n_hotels]
+            stop = {
+                "name": poi.get("name", p.names[v]), "start": hhmm(start), "end": hhmm(start + p.duration[v]),
+                "lat": poi["lat"], "lon": poi["lon"],
+                "leg": {"duration_min": int(p.travel[prev, v])},
+            }
+            hours = poi.get("opening_hours")
+            if isinstance(hours, dict):
+                hours = hours.get(WEEKDAYS[datetime.date.fromisoformat(date).weekday()], [])
+            if hours is not None:
+                stop["opening_hours"] = hours
+            for key in ("cost", "id"):
+                if key in poi:
+                    stop[key] = poi[key]
+            stops.append(stop)
+            prev = v
+        return stops
+
+
+def solve(problem: dict, time_limit_s: float = 3.0, travel: np.ndarray | None = None, index=None, cache=None,
+          handle: str | None = None) -> dict:
+    return Solver(Problem.from_json(problem, travel, index, cache, handle), time_limit_s).solve().itinerary()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("problem", help="problem JSON file")
+    parser.add_argument("--index", help="routing index for real travel times (default: distance estimate)")
+    parser.add_argument("--time-limit", type=float, default=3.0, help="wall-clock budget in seconds")
+    parser.add_argument("--cache-dir", help="matrix cache (default with --index: <index>.matrices)")
+    parser.add_argument("--matrix-handle", help="reuse this cached matrix instead of computing one")
+    args = parser.parse_args()
+    with open(args.problem) as f:
+        problem = json.load(f)
+    index = cache = None
+    if args.index or args.cache_dir:
+        from matrix import MatrixCache, default_cache_dir
+
+        cache = MatrixCache(args.cache_dir or default_cache_dir(args.index))
+    elif args.matrix_handle:
+        parser.error("--matrix-handle needs --cache-dir or --index")
+    if args.index and not args.matrix_handle:
+        from routing import RoutingIndex
+
+        index = RoutingIndex(args.index)
+    json.dump(solve(problem, args.time_limit, index=index, cache=cache, handle=args.matrix_handle),
+              sys.stdout, ensure_ascii=False, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""Program-based itinerary validator.
+
+An itinerary is JSON::
+
+    {
+      "budget": 2500, "currency": "EUR",
+      "days": [
+        {
+          "date": "2026-05-01",
+          "budget": 300,                                   # optional per-day cap
+          "hotel": {"name": "H", "lat": 48.86, "lon": 2.35,
+                    "check_in": "15:00", "check_out": "11:00", "cost": 140},
+          "stops": [
+            {"name": "Louvre", "start": "09:30", "end": "12:00", "lat": 48.861, "lon": 2.336,
+             "opening_hours": [["09:00", "18:00"]], "cost": 22,
+             "leg": {"duration_min": 15, "mode": "metro", "cost": 2.15}},   # travel from previous stop
+            {"name": "Check in", "type": "check_in", "start": "15:30", "end": "15:45"}
+          ]
+        }
+      ]
+    }
+
+Times are ``HH:MM`` on the day's date (``25:30`` is 01:30 the next morning).
+Without a ``leg`` the transfer time is estimated from coordinates.  The
+``hotel`` is where the traveller sleeps that night; ``check_in`` stops are
+checked against it and ``check_out`` stops against the previous night's hotel.
+
+    python scripts/validator.py itinerary.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import json
+import sys
+from dataclasses import dataclass
+from typing import Iterator
+
+from routing import haversine_m
+
+DETOUR_FACTOR = 1.3
+DEFAULT_SPEED_KMH = 15.0
+
+
+@dataclass(frozen=True)
+class Issue:
+    kind: str  # invalid_time | closed | overlap | impossible_transfer | check_in | check_out | missing_hotel | budget
+    day: int | None
+    stop: int | None
+    message: str
+
+    def __str__(self) -> str:
+        where = "trip" if self.day is None else f"day {self.day + 1}" + ("" if self.stop is None else f" stop {self.stop + 1}")
+        return f"{where}: {self.kind}: {self.message}"
+
+
+def minutes(hhmm: str) -> int:
+    h, m = hhmm.split(":")
+    return int(h) * 60 + int(m)
+
+
+class IntervalIndex:
+    """Intervals sorted by start with a running maximum of ends, for overlap queries."""
+
+    def __init__(self, intervals: list[tuple[int, int, int]] = ()) -> None:
+        self._items = sorted(intervals)
+        self._starts = [s for s, _, _ in self._items]
+        self._rebuild_max()
+
+    def _rebuild_max(self) -> None:
+        self._max_end, top = [], -1
+        for _, end, _ in self._items:
+            top = max(top, end)
+            self._max_end.append(top)
+
+    def add(self, start: int, end: int, key: int) -> None:
+        i = bisect.bisect_right(self._starts, start)
+        self._items.insert(i, (start, end, key))
+        self._starts.insert(i, start)
+        self._rebuild_max()
+
+    def remove(self, key: int) -> None:
+        i = next(i for i, item in enumerate(self._items) if item[2] == key)
+        del self._items[i], self._starts[i]
+        self._rebuild_max()
+
+    def overlapping(self, start: int, end: int) -> Iterator[int]:
+        """Keys of intervals that intersect ``[start, end)``."""
+        i = bisect.bisect_left(self._starts, end) - 1
+        while i >= 0 and self._max_end[i] > start:
+            s, e, key = self._items[i]
+            if e > start and s < end:
+                yield key
+            i -= 1
+
+    def in_order(self) -> list[int]:
+        return [key for _, _, key in self._items]
+
+
+class Validator:
+    """Validates a whole itinerary once, then re-checks only the day touched by an edit."""
+
+    def __init__(self, itinerary: dict) -> None:
+        self.itinerary = itinerary
+        self.days: list[dict] = itinerary["days"]
+        self.speed_kmh = float(itinerary.get("travel_speed_kmh", DEFAULT_SPEED_KMH))
+        self._indexes: list[IntervalIndex] = []
+        self._day_issues: list[list[Issue]] = []
+        self._day_costs: list[float] = []
+        for d in range(len(self.days)):
+            self._indexes.append(IntervalIndex())
+            self._day_issues.append([])
+            self._day_costs.append(0.0)
+            self._check_day(d, reindex=True)
+
+    # -- results
+
+    @property
+    def issues(self) -> list[Issue]:
+        out = [issue for day in self._day_issues for issue in day]
+        budget = self.itinerary.get("budget")
+        total = sum(self._day_costs)
+        if budget is not None and total > budget:
+            unit = f" {self.itinerary['currency']}" if "currency" in self.itinerary else ""
+            out.append(Issue("budget", None, None, f"total {total:.2f}{unit} exceeds budget {budget}{unit}"))
+        return out
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+    # -- edits
+
+    def update_stop(self, day: int, index: int, stop: dict) -> list[Issue]:
+        self.days[day]["stops"][index] = stop
+        self._indexes[day].remove(index)
+        start, end = self._interval(stop)
+        self._indexes[day].add(start, end, index)
+        self._check_day(day)
+        return self.issues
+
+    def insert_stop(self, day: int, index: int, stop: dict) -> list[Issue]:
+        self.days[day]["stops"].insert(index, stop)
+        self._check_day(day, reindex=True)
+        return self.issues
+
+    def remove_stop(self, day: int, index: int) -> list[Issue]:
+        del self.days[day]["stops"][index]
+        self._check_day(day, reindex=True)
+        return self.issues
+
+    def set_stops(self, day: int, stops: list[dict]) -> list[Issue]:
+        self.days[day]["stops"] = stops
+        self._check_day(day, reindex=True)
+        return self.issues
+
+    def set_hotel(self, day: int, hotel: dict | None) -> list[Issue]:
+        self.days[day]["hotel"] = hotel
+        self._check_day(day)
+        if day + 1 < len(self.days):
+            self._check_day(day + 1)  # its check-out refers to this night's hotel
+        return self.issues
+
+    # -- checks
+
+    @staticmethod
+    def _interval(stop: dict) -> tuple[int, int]:
+        return minutes(stop["start"]), minutes(stop["end"])
+
+    def _check_day(self, d: int, reindex: bool = False) -> None:
+        day = self.days[d]
+        stops = day.get("stops", [])
+        if reindex:
+            self._indexes[d] = IntervalIndex([(*self._interval(s), i) for i, s in enumerate(stops)])
+        index = self._indexes[d]
+        issues: list[Issue] = []
+        cost = float((day.get("hotel") or {}).get("cost", 0))
+
+        for i, stop in enumerate(stops):
+            start, end = self._interval(stop)
+            cost += float(stop.get("cost", 0)) + float((stop.get("leg") or {}).get("cost", 0))
+            if end <= start:
+                issues.append(Issue("invalid_time", d, i, f"{stop['name']} ends at {stop['end']}, before it starts at {stop['start']}"))
+                continue
+            hours = stop.get("opening_hours")
+            if hours is not None and not any(minutes(o) <= start and end <= minutes(c) for o, c in hours):
+                issues.append(Issue("closed", d, i, f"{stop['name']} {stop['start']}-{stop['end']} is outside opening hours {_fmt_hours(hours)}"))
+            for j in index.overlapping(start, end):
+                if j > i:
+                    issues.append(Issue("overlap", d, i, f"{stop['name']} overlaps {stops[j]['name']}"))
+            issues.extend(self._check_hotel_event(d, i, stop, start))
+
+        order = index.in_order()
+        for prev, nxt in zip(order, order[1:]):
+            a, b = stops[prev], stops[nxt]
+            gap = minutes(b["start"]) - minutes(a["end"])
+            need = self._transfer_minutes(a, b)
+            if gap >= 0 and need is not None and gap < need:
+                issues.append(Issue("impossible_transfer", d, nxt,
+                                    f"{gap} min from {a['name']} to {b['name']}, needs ~{need:.0f} min"))
+
+        if day.get("hotel") is None and d + 1 < len(self.days):
+            issues.append(Issue("missing_hotel", d, None, "no hotel for the night"))
+        if day.get("budget") is not None and cost > day["budget"]:
+            issues.append(Issue("budget", d, None, f"day total {cost:.2f} exceeds day budget {day['budget']}"))
+        self._day_issues[d] = issues
+        self._day_costs[d] = cost
+
+    def _check_hotel_event(self, d: int, i: int, stop: dict, start: int) -> list[Issue]:
+        kind = stop.get("type")
+        if kind == "check_in":
+            hotel = self.days[d].get("hotel")
+            if hotel and "check_in" in hotel and start < minutes(hotel["check_in"]):
+                return [Issue("check_in", d, i, f"check-in at {stop['start']} before {hotel['name']} opens check-in at {hotel['check_in']}")]
+        elif kind == "check_out":
+            hotel = self.days[d - 1].get("hotel") if d > 0 else None
+            if hotel and "check_out" in hotel and start > minutes(hotel["check_out"]):
+                return [Issue("check_out", d, i, f"check-out at {stop['start']} after {hotel['name']} deadline {hotel['check_out']}")]
+        return []
+
+    def _transfer_minutes(self, a: dict, b: dict) -> float | None:
+        leg = b.get("leg")
+        if leg is not None and "duration_min" in leg:
+            return float(leg["duration_min"])
+        if all(k in s for s in (a, b) for k in ("lat", "lon")):
+            metres = haversine_m((a["lat"], a["lon"]), (b["lat"], b["lon"])) * DETOUR_FACTOR
+            return metres / (self.speed_kmh * 1000 / 60)
+        return None
+
+
+def _fmt_hours(hours: list[list[str]]) -> str:
+    return ", ".join(f"{o}-{c}" for o, c in hours) or "closed"
+
+
+def validate(itinerary: dict) -> list[Issue]:
+    return Validator(itinerary).issues
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("itinerary", help="itinerary JSON file")
+    args = parser.parse_args()
+    with open(args.itinerary) as f:
+        issues = validate(json.load(f))
+    for issue in issues:
+        print(issue)
+    sys.exit(1 if issues else 0)
+
+
+if __name__ == "__main__":
+    main()
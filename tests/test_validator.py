@@ -0,0 +1,55 @@
+import copy
+
+from bench_validator import best_of, synthetic_itinerary
+from validator import Validator, validate
+
+HOTEL = {"name": "H", "lat": 48.85, "lon": 2.35, "check_in": "15:00", "check_out": "11:00", "cost": 100}
+
+
+def _stop(name: str, start: str, end: str, **extra) -> dict:
+    return {"name": name, "start": start, "end": end, "lat": 48.85, "lon": 2.35, **extra}
+
+
+def _trip(*days: list[dict]) -> dict:
+    return {"days": [{"date": f"2026-05-{d + 1:02d}", "hotel": dict(HOTEL), "stops": stops} for d, stops in enumerate(days)]}
+
+
+def test_full_validation_under_100_ms():
+    itinerary = synthetic_itinerary(30, 400)
+    assert Validator(itinerary).ok
+    assert best_of(lambda: Validator(itinerary), 5) < 0.100
+
+
+def test_edit_cheaper_than_full_validation():
+    itinerary = synthetic_itinerary(30, 400)
+    validator = Validator(itinerary)
+    stop = itinerary["days"][12]["stops"][-1]
+    last = len(itinerary["days"][12]["stops"]) - 1
+    full_s = best_of(lambda: Validator(itinerary), 5)
+    edit_s = best_of(lambda: validator.update_stop(12, last, dict(stop)), 5)
+    assert edit_s < full_s
+
+
+def test_overlap():
+    issues = validate(_trip([_stop("A", "10:00", "11:00"), _stop("B", "10:30", "11:30")]))
+    assert [i.kind for i in issues] == ["overlap"]
+    assert (issues[0].day, issues[0].stop) == (0, 0)
+
+
+def test_closed():
+    issues = validate(_trip([_stop("Museum", "08:00", "09:30", opening_hours=[["09:00", "18:00"]])]))
+    assert [i.kind for i in issues] == ["closed"]
+
+
+def test_check_out_after_deadline():
+    issues = validate(_trip([], [_stop("Check out", "12:00", "12:15", type="check_out")]))
+    assert [(i.kind, i.day) for i in issues] == [("check_out", 1)]
+
+
+def test_update_stop_clears_issue():
+    itinerary = _trip([_stop("Museum", "08:00", "09:30", opening_hours=[["09:00", "18:00"]])])
+    validator = Validator(itinerary)
+    assert not validator.ok
+    fixed = dict(itinerary["days"][0]["stops"][0], start="09:00", end="10:30")
+    assert validator.update_stop(0, 0, fixed) == []
+    assert validator.issues == validate(copy.deepcopy(itinerary))